@@ -15,14 +15,43 @@ Linked lists are used to implement other data structures like stacks, queues, an
 
 In this snippet, we will implement the following functions:
 1. Reverse a singly-linked list.
-2. Merge two sorted linked lists.
-3. Sort a linked list using merge sort.
+2. Merge two sorted linked lists, or k sorted lists and iterators with a heap.
+3. Sort a linked list using merge sort (recursive top-down or
+   iterative bottom-up merging of natural runs).
+4. Sort a list larger than RAM with external merge sort: sorted runs are
+   spilled to temporary binary files and merged back through memory-mapped
+   buffers into a lazily materialised linked list.
+5. Index a sorted list with a probabilistic skip list for O(log n) expected
+   search, insert, delete and range iteration.
+
+The list can be stored either as a chain of ListNode objects or in a compact
+array-backed storage, where values and next-pointers live in parallel typed
+arrays and nodes are addressed by slot index. The functions above work on both.
 
 Time complexity:
 - Reverse a singly-linked list: O(n)
 - Merge two sorted linked lists: O(n)
+- Merge k sorted linked lists and iterators: O(n log k)
 - Sort a linked list using merge sort: O(n log n)
+- Sort a linked list using bottom-up merge sort: O(n log r), r - number of runs,
+  O(n) for already sorted input
+- External merge sort: O(n log n), O(memory_limit) memory
+- Skip list index: O(n) build, O(log n) expected search, insert and delete
+
+The storage benchmark runs only with --benchmark:
+    python 1.linked_list.py --benchmark
 """
+import heapq
+import mmap
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from itertools import islice
+
 class ListNode:
     """
     Definition for singly-linked list.
@@ -39,15 +68,575 @@ class ListNode:
         self.value = value
         self.next = next
 
+class LazyListNode(ListNode):
+    """
+    Node of a lazily materialised singly-linked list.
+
+    The next node is created from the shared value iterator on first access,
+    so only the part of the list that was actually walked exists in memory.
+    Assigning next detaches the node from the iterator.
+    """
+    def __init__(self, value, source):
+        """
+        Initialize the node with value and the iterator of the following values.
+
+        :param value: int - value of the node
+        :param source: iterator - iterator of the following values
+
+        :return: None
+        """
+        self.value = value
+        self._next = None
+        self._source = source
+
+    @property
+    def next(self) -> ListNode:
+        if self._source is not None:
+            source, self._source = self._source, None
+            for value in source:
+                self._next = LazyListNode(value, source)
+                break
+        return self._next
+
+    @next.setter
+    def next(self, node: ListNode) -> None:
+        self._source = None
+        self._next = node
+
+class ArrayStorage:
+    """
+    Compact storage for singly-linked lists.
+
+    Values and next-pointers are kept in two parallel typed arrays.
+    A next-pointer is the slot index of the next node, -1 marks the end of the list.
+    Slots of removed nodes are kept on a free list and reused by allocate,
+    so the storage does not grow under insert/remove churn.
+    """
+    def __init__(self, typecode: str = "q"):
+        """
+        Initialize empty storage.
+
+        :param typecode: str - array typecode for the values ("q" for int, "d" for float)
+
+        :return: None
+        """
+        self.values = array(typecode)
+        self.next_index = array("q")
+        self.free_slots = array("q")
+
+    def allocate(self, value) -> "ArrayListNode":
+        """
+        Allocate a new node in the storage.
+
+        :param value: int - value of the node
+
+        :return: ArrayListNode - handle of the new node
+
+        Time complexity: O(1) amortized
+        """
+        if self.free_slots:
+            index = self.free_slots.pop()
+            self.values[index] = value
+            self.next_index[index] = -1
+            return ArrayListNode(self, index)
+        self.values.append(value)
+        self.next_index.append(-1)
+        return ArrayListNode(self, len(self.values) - 1)
+
+    def release(self, node: "ArrayListNode") -> None:
+        """
+        Return the slot of an unlinked node to the free list.
+
+        Handles of the node must not be used afterwards, the slot is given
+        to the next allocated node.
+
+        :param node: ArrayListNode - node that is no longer part of any list
+
+        :return: None
+
+        Time complexity: O(1) amortized
+        """
+        self.next_index[node.index] = -1
+        self.free_slots.append(node.index)
+
+    def extend(self, values) -> "ArrayListNode":
+        """
+        Allocate a chain of nodes from an iterable of values.
+
+        :param values: iterable - values of the nodes in list order
+
+        :return: ArrayListNode - head of the new chain or None if values is empty
+
+        Time complexity: O(n)
+        """
+        start = len(self.values)
+        self.values.extend(values)
+        end = len(self.values)
+        if start == end:
+            return None
+        self.next_index.extend(range(start + 1, end))
+        self.next_index.append(-1)
+        return ArrayListNode(self, start)
+
+    def __len__(self) -> int:
+        return len(self.values) - len(self.free_slots)
+
+class ArrayListNode:
+    """
+    Lightweight handle of a node in ArrayStorage.
+
+    Handles have the same value/next interface as ListNode, so all list
+    functions of this module work on array-backed lists without changes.
+    Handles are created on access and hold no data themselves.
+    """
+    __slots__ = ("storage", "index")
+
+    def __init__(self, storage: ArrayStorage, index: int):
+        """
+        Initialize the handle.
+
+        :param storage: ArrayStorage - storage the node lives in
+        :param index: int - slot index of the node
+
+        :return: None
+        """
+        self.storage = storage
+        self.index = index
+
+    @property
+    def value(self):
+        return self.storage.values[self.index]
+
+    @value.setter
+    def value(self, value) -> None:
+        self.storage.values[self.index] = value
+
+    @property
+    def next(self) -> "ArrayListNode":
+        next_index = self.storage.next_index[self.index]
+        if next_index < 0:
+            return None
+        return ArrayListNode(self.storage, next_index)
+
+    @next.setter
+    def next(self, node: "ArrayListNode") -> None:
+        if node is None:
+            self.storage.next_index[self.index] = -1
+        elif isinstance(node, ArrayListNode) and node.storage is self.storage:
+            self.storage.next_index[self.index] = node.index
+        else:
+            raise ValueError("Cannot link nodes from different storages")
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, ArrayListNode)
+            and other.storage is self.storage
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.storage), self.index))
+
 class LinkedList:
     """
     Definition for singly-linked list.
+
+    Attributes:
+    - head: ListNode or ArrayListNode - the first node of the list
+    - storage: ArrayStorage - array-backed storage, None for ListNode chains
+    - index: SkipListIndex - optional skip list index of a sorted list
+    - version: int - counter incremented by every change of the list, including
+      every assignment to head
     """
-    def __init__(self):
+    def __init__(self, storage: str = "node", typecode: str = "q"):
         """
         Initialize the head of the linked list.
+
+        :param storage: str - "node" for ListNode chains, "array" for compact array-backed storage
+        :param typecode: str - array typecode for the values of array-backed storage
+
+        :return: None
         """
+        if storage not in ("node", "array"):
+            raise ValueError(f"Unknown storage: {storage}")
+        self.version = 0
         self.head = None
+        self.storage = ArrayStorage(typecode) if storage == "array" else None
+        self.index = None
+
+    @property
+    def head(self):
+        return self._head
+
+    @head.setter
+    def head(self, node) -> None:
+        # Module functions may relink the chain and return the same head,
+        # so every assignment counts as a change
+        self._head = node
+        self.version += 1
+
+    @classmethod
+    def from_values(cls, values, storage: str = "node", typecode: str = "q") -> "LinkedList":
+        """
+        Build a linked list from an iterable of values.
+
+        :param values: iterable - values in list order
+        :param storage: str - "node" or "array"
+        :param typecode: str - array typecode for the values of array-backed storage
+
+        :return: LinkedList
+
+        Time complexity: O(n)
+        """
+        linked_list = cls(storage, typecode)
+        if linked_list.storage is not None:
+            linked_list.head = linked_list.storage.extend(values)
+            return linked_list
+
+        dummy = ListNode()
+        tail = dummy
+        for value in values:
+            tail.next = ListNode(value)
+            tail = tail.next
+        linked_list.head = dummy.next
+        return linked_list
+
+    def new_node(self, value):
+        """
+        Create a node that belongs to this list's storage.
+
+        :param value: int - value of the node
+
+        :return: ListNode or ArrayListNode
+
+        Time complexity: O(1)
+        """
+        if self.storage is not None:
+            return self.storage.allocate(value)
+        return ListNode(value)
+
+    def __iter__(self):
+        current = self.head
+        while current:
+            yield current.value
+            current = current.next
+
+    def sort(self, mode: str = "top_down") -> None:
+        """
+        Sort the list in place with merge sort, the index is rebuilt if present.
+
+        :param mode: str - merge sort mode, see merge_sort
+
+        :return: None
+
+        Time complexity: O(n log n)
+        """
+        self.head = merge_sort(self.head, mode)
+        if self.index is not None:
+            self.index.rebuild()
+
+    def build_index(self, probability: float = 0.5, seed: int = None) -> "SkipListIndex":
+        """
+        Build a skip list index over the sorted list.
+
+        :param probability: float - probability to promote a node to the next index level
+        :param seed: int - seed of the random level generator
+
+        :return: SkipListIndex
+
+        Time complexity: O(n)
+        """
+        self.index = SkipListIndex(self, probability, seed)
+        return self.index
+
+    def insert_sorted(self, value):
+        """
+        Insert a value into the sorted list after all equal values.
+
+        :param value: int - value to insert
+
+        :return: ListNode or ArrayListNode - the new node
+
+        Time complexity: O(log n) expected with index, O(n) without
+        """
+        if self.index is not None:
+            return self.index.insert(value)
+
+        pred = None
+        current = self.head
+        while current is not None and current.value <= value:
+            pred = current
+            current = current.next
+        node = self.new_node(value)
+        node.next = current
+        if pred is None:
+            self.head = node
+        else:
+            pred.next = node
+        self.version += 1
+        return node
+
+    def remove(self, value) -> bool:
+        """
+        Remove the first node with the value from the sorted list.
+
+        :param value: int - value to remove
+
+        :return: bool - True if the value was found and removed
+
+        Time complexity: O(log n) expected with index, O(n) without
+        """
+        if self.index is not None:
+            return self.index.remove(value)
+
+        pred = None
+        current = self.head
+        while current is not None and current.value < value:
+            pred = current
+            current = current.next
+        if current is None or current.value != value:
+            return False
+        if pred is None:
+            self.head = current.next
+        else:
+            pred.next = current.next
+        if self.storage is not None:
+            self.storage.release(current)
+        self.version += 1
+        return True
+
+    def __contains__(self, value) -> bool:
+        if self.index is not None:
+            return value in self.index
+        return any(item == value for item in self)
+
+class _SkipEntry:
+    """
+    Tower of forward pointers of an indexed node in SkipListIndex.
+    """
+    __slots__ = ("node", "forward")
+
+    def __init__(self, node, level: int):
+        self.node = node
+        self.forward = [None] * level
+
+class SkipListIndex:
+    """
+    Probabilistic skip list index over a sorted linked list.
+
+    The linked list itself is the bottom level of the skip list, so nodes
+    are not copied: every node is promoted to the upper index levels with
+    the given probability. A search descends the index levels and finishes
+    with a short walk along the chain.
+
+    The index stays consistent while the list is modified through
+    LinkedList.insert_sorted, LinkedList.remove and LinkedList.sort. It is
+    rebuilt automatically on the next access whenever LinkedList.version
+    changes, e.g. after L.head = merge_sorted_lists(L.head, other.head).
+    Nodes relinked by hand without assigning L.head require an explicit
+    rebuild().
+
+    Attributes:
+    - linked_list: LinkedList - the indexed sorted list
+    - probability: float - probability to promote a node to the next level
+    - level: int - number of index levels in use
+
+    Time complexity:
+    - rebuild: O(n)
+    - search, insert, remove: O(log n) expected
+    - irange: O(log n + k) expected, k - number of values in range
+    """
+    MAX_LEVEL = 32
+
+    def __init__(self, linked_list: LinkedList, probability: float = 0.5, seed: int = None):
+        """
+        Initialize the index and build it over the list.
+
+        :param linked_list: LinkedList - sorted linked list to index
+        :param probability: float - probability to promote a node to the next level
+        :param seed: int - seed of the random level generator
+
+        :return: None
+
+        Time complexity: O(n)
+        """
+        if not 0 < probability < 1:
+            raise ValueError("Probability must be between 0 and 1")
+        self.linked_list = linked_list
+        self.probability = probability
+        self._random = random.Random(seed)
+        self.rebuild()
+
+    def _random_level(self) -> int:
+        level = 0
+        while level < self.MAX_LEVEL and self._random.random() < self.probability:
+            level += 1
+        return level
+
+    def rebuild(self) -> None:
+        """
+        Rebuild the index from the current state of the list.
+
+        :return: None
+
+        Time complexity: O(n)
+        """
+        self._header = _SkipEntry(None, self.MAX_LEVEL)
+        self.level = 0
+        self._size = 0
+        tails = [self._header] * self.MAX_LEVEL
+
+        prev = None
+        current = self.linked_list.head
+        while current is not None:
+            if prev is not None and current.value < prev.value:
+                raise ValueError("Skip list index requires a sorted linked list")
+            level = self._random_level()
+            if level:
+                entry = _SkipEntry(current, level)
+                for i in range(level):
+                    tails[i].forward[i] = entry
+                    tails[i] = entry
+                self.level = max(self.level, level)
+            self._size += 1
+            prev = current
+            current = current.next
+
+        self._version = self.linked_list.version
+
+    def _find(self, value, inclusive: bool) -> tuple:
+        """
+        Find the position of a value in the list.
+
+        :param value: int - value to look for
+        :param inclusive: bool - stop after equal values instead of before them
+
+        :return: tuple - index predecessors per level, chain predecessor node
+                 (None for the list head) and the node at the position
+
+        Time complexity: O(log n) expected
+        """
+        if self.linked_list.version != self._version:
+            self.rebuild()
+
+        update = [self._header] * self.MAX_LEVEL
+        entry = self._header
+        for i in range(self.level - 1, -1, -1):
+            next_entry = entry.forward[i]
+            while next_entry is not None and (
+                next_entry.node.value <= value if inclusive else next_entry.node.value < value
+            ):
+                entry = next_entry
+                next_entry = entry.forward[i]
+            update[i] = entry
+
+        pred = entry.node
+        current = pred.next if pred is not None else self.linked_list.head
+        while current is not None and (current.value <= value if inclusive else current.value < value):
+            pred = current
+            current = current.next
+        return update, pred, current
+
+    def search(self, value):
+        """
+        Find the first node with the value.
+
+        :param value: int - value to look for
+
+        :return: ListNode or ArrayListNode - the node or None if not found
+
+        Time complexity: O(log n) expected
+        """
+        _, _, current = self._find(value, inclusive=False)
+        if current is not None and current.value == value:
+            return current
+        return None
+
+    def __contains__(self, value) -> bool:
+        return self.search(value) is not None
+
+    def __len__(self) -> int:
+        if self.linked_list.version != self._version:
+            self.rebuild()
+        return self._size
+
+    def insert(self, value):
+        """
+        Insert a value into the list after all equal values.
+
+        :param value: int - value to insert
+
+        :return: ListNode or ArrayListNode - the new node
+
+        Time complexity: O(log n) expected
+        """
+        update, pred, current = self._find(value, inclusive=True)
+        node = self.linked_list.new_node(value)
+        node.next = current
+        if pred is None:
+            self.linked_list.head = node
+        else:
+            pred.next = node
+        self.linked_list.version += 1
+        self._version = self.linked_list.version
+
+        level = self._random_level()
+        if level:
+            entry = _SkipEntry(node, level)
+            for i in range(level):
+                entry.forward[i] = update[i].forward[i]
+                update[i].forward[i] = entry
+            self.level = max(self.level, level)
+        self._size += 1
+        return node
+
+    def remove(self, value) -> bool:
+        """
+        Remove the first node with the value from the list.
+
+        :param value: int - value to remove
+
+        :return: bool - True if the value was found and removed
+
+        Time complexity: O(log n) expected
+        """
+        update, pred, current = self._find(value, inclusive=False)
+        if current is None or current.value != value:
+            return False
+
+        for i in range(self.level):
+            next_entry = update[i].forward[i]
+            if next_entry is not None and next_entry.node == current:
+                update[i].forward[i] = next_entry.forward[i]
+        while self.level and self._header.forward[self.level - 1] is None:
+            self.level -= 1
+
+        if pred is None:
+            self.linked_list.head = current.next
+        else:
+            pred.next = current.next
+        self.linked_list.version += 1
+        self._version = self.linked_list.version
+        if self.linked_list.storage is not None:
+            self.linked_list.storage.release(current)
+        self._size -= 1
+        return True
+
+    def irange(self, start, stop):
+        """
+        Iterate over the values v with start <= v < stop.
+
+        :param start: int - lower bound, inclusive
+        :param stop: int - upper bound, exclusive
+
+        :return: generator of values in sorted order
+
+        Time complexity: O(log n + k) expected, k - number of values in range
+        """
+        _, _, current = self._find(start, inclusive=False)
+        while current is not None and current.value < stop:
+            yield current.value
+            current = current.next
 
 def reverse_list(head: ListNode) -> ListNode:
     """
@@ -59,6 +648,9 @@ def reverse_list(head: ListNode) -> ListNode:
 
     Time complexity: O(n)
     """
+    if isinstance(head, ArrayListNode):
+        return _to_node(head.storage, _reverse_indices(head.storage.next_index, head.index))
+
     prev = None
     current = head
     while current:
@@ -69,16 +661,38 @@ def reverse_list(head: ListNode) -> ListNode:
     return prev
 
 
-def merge_sort(head: ListNode) -> ListNode:
+def merge_sort(head: ListNode, mode: str = "top_down") -> ListNode:
     """
     Sort a singly-linked list using merge sort.
 
+    The "top_down" mode splits the list in the middle recursively.
+    The "bottom_up" mode splits the list into natural ascending and
+    descending runs (descending runs are reversed in place) and merges
+    neighbouring runs iteratively until one run is left.
+    Both modes are stable.
+
     :param head: ListNode
+    :param mode: str - "top_down" or "bottom_up"
 
     :return: ListNode
 
-    Time complexity: O(n log n)
+    Time complexity:
+    - top_down: O(n log n)
+    - bottom_up: O(n log r), r - number of runs, O(n) for sorted input
     """
+    if mode not in ("top_down", "bottom_up"):
+        raise ValueError(f"Unknown merge sort mode: {mode}")
+
+    if isinstance(head, ArrayListNode):
+        storage = head.storage
+        if mode == "bottom_up":
+            runs = _find_runs_indices(storage.values, storage.next_index, head.index)
+            return _to_node(storage, _merge_runs_indices(storage.values, storage.next_index, runs))
+        return _to_node(storage, _merge_sort_indices(storage.values, storage.next_index, head.index))
+
+    if mode == "bottom_up":
+        return _merge_runs(_find_runs(head))
+
     if not head or not head.next:
         return head
 
@@ -112,7 +726,7 @@ def merge(left: ListNode, right: ListNode) -> ListNode:
     tail = dummy
 
     while left and right:
-        if left.value < right.value:
+        if left.value <= right.value:
             tail.next = left
             left = left.next
         else:
@@ -123,10 +737,139 @@ def merge(left: ListNode, right: ListNode) -> ListNode:
     tail.next = left if left else right
     return dummy.next
 
+def _find_runs(head: ListNode) -> list:
+    """
+    Split a linked list into sorted runs.
+
+    A run is either non-decreasing or strictly decreasing, strictly
+    decreasing runs are reversed in place, so reversing keeps the sort stable.
+
+    :param head: ListNode
+
+    :return: list - heads of the ascending runs in list order
+
+    Time complexity: O(n)
+    """
+    runs = []
+    current = head
+    while current:
+        run_head = current
+        next_node = current.next
+        if next_node and next_node.value < current.value:
+            while next_node and next_node.value < current.value:
+                current = next_node
+                next_node = current.next
+            current.next = None
+            runs.append(reverse_list(run_head))
+        else:
+            while next_node and next_node.value >= current.value:
+                current = next_node
+                next_node = current.next
+            current.next = None
+            runs.append(run_head)
+        current = next_node
+    return runs
+
+def _merge_runs(runs: list) -> ListNode:
+    """
+    Merge neighbouring sorted runs pairwise until one run is left.
+
+    :param runs: list - heads of the sorted runs in list order
+
+    :return: ListNode - head of the sorted list
+
+    Time complexity: O(n log r), r - number of runs
+    """
+    if not runs:
+        return None
+    while len(runs) > 1:
+        merged = [merge(runs[i], runs[i + 1]) for i in range(0, len(runs) - 1, 2)]
+        if len(runs) % 2:
+            merged.append(runs[-1])
+        runs = merged
+    return runs[0]
+
+# Approximate bytes needed to sort one buffered value in a Python list:
+# the list slot, the value object and the sort's temporary storage
+_SORT_BYTES_PER_VALUE = 64
+
+def external_merge_sort(source, memory_limit: int = 64 * 2 ** 20, typecode: str = "q",
+                        tmp_dir: str = None) -> LazyListNode:
+    """
+    Sort a list that does not fit in memory using external merge sort.
+
+    The values are read in runs that fit into memory_limit, every run is sorted
+    and spilled to a temporary binary file. The runs are then memory-mapped and
+    merged with a k-way heap merge. The result is a lazily materialised linked
+    list: nodes are created while the list is walked and the temporary files
+    are removed once the merge is exhausted.
+
+    :param source: ListNode, LinkedList or iterable of values
+    :param memory_limit: int - approximate memory budget for a run in bytes
+    :param typecode: str - array typecode of the values ("q" for int, "d" for float)
+    :param tmp_dir: str - directory for the temporary run files
+
+    :return: LazyListNode - head of the sorted list or None if source is empty
+
+    Time complexity: O(n log n)
+    """
+    run_size = max(1, memory_limit // _SORT_BYTES_PER_VALUE)
+    run_dir = tempfile.TemporaryDirectory(dir=tmp_dir)
+    run_paths = []
+    try:
+        values = (value for value, _ in _iter_source_nodes(source))
+        while True:
+            run = array(typecode, sorted(islice(values, run_size)))
+            if not run:
+                break
+            path = os.path.join(run_dir.name, f"run_{len(run_paths)}.bin")
+            with open(path, "wb") as run_file:
+                run.tofile(run_file)
+            run_paths.append(path)
+            del run
+    except BaseException:
+        run_dir.cleanup()
+        raise
+
+    merged = _iter_external_runs(run_dir, run_paths, typecode)
+    for value in merged:
+        return LazyListNode(value, merged)
+    return None
+
+def _iter_external_runs(run_dir: tempfile.TemporaryDirectory, run_paths: list, typecode: str):
+    """
+    Merge sorted run files through memory-mapped buffers.
+
+    :param run_dir: TemporaryDirectory - directory with the run files, removed at the end
+    :param run_paths: list - paths of the run files
+    :param typecode: str - array typecode of the values
+
+    :return: generator of values in sorted order
+
+    Time complexity: O(n log k), k - number of runs
+    """
+    maps = []
+    views = []
+    try:
+        for path in run_paths:
+            with open(path, "rb") as run_file:
+                buffer = mmap.mmap(run_file.fileno(), 0, access=mmap.ACCESS_READ)
+            maps.append(buffer)
+            views.append(memoryview(buffer).cast(typecode))
+        yield from iter_merge_sorted(views)
+    finally:
+        for view in views:
+            view.release()
+        for buffer in maps:
+            buffer.close()
+        run_dir.cleanup()
+
 def merge_sorted_lists(l1: ListNode, l2: ListNode) -> ListNode:
     """
     Merge two sorted linked lists.
 
+    The merge is stable: of equal values the ones from l1 come first.
+
     :param l1: ListNode
     :param l2: ListNode
 
@@ -134,11 +877,15 @@ def merge_sorted_lists(l1: ListNode, l2: ListNode) -> ListNode:
 
     Time complexity: O(n)
     """
+    if isinstance(l1, ArrayListNode) and isinstance(l2, ArrayListNode) and l1.storage is l2.storage:
+        storage = l1.storage
+        return _to_node(storage, _merge_indices(storage.values, storage.next_index, l1.index, l2.index))
+
     dummy = ListNode()
     current = dummy
 
     while l1 and l2:
-        if l1.value < l2.value:
+        if l1.value <= l2.value:
             current.next = l1
             l1 = l1.next
         else:
@@ -151,6 +898,248 @@ def merge_sorted_lists(l1: ListNode, l2: ListNode) -> ListNode:
     return dummy.next
 
 
+def _iter_source_nodes(source):
+    """
+    Iterate over a merge source yielding (value, node) pairs.
+
+    ListNode chains yield their own nodes so they can be relinked in place,
+    all other sources (LinkedList, ArrayListNode chains, iterables) yield None instead of a node.
+    The next node is read only when the following pair is requested.
+
+    :param source: ListNode, ArrayListNode, LinkedList, iterable or None
+
+    :return: generator of (value, ListNode or None) pairs
+    """
+    if isinstance(source, LinkedList):
+        source = source.head
+    if source is None:
+        return
+    if isinstance(source, ListNode):
+        current = source
+        while current:
+            next_node = current.next
+            yield current.value, current
+            current = next_node
+        return
+    if isinstance(source, ArrayListNode):
+        current = source
+        while current:
+            yield current.value, None
+            current = current.next
+        return
+    for value in source:
+        yield value, None
+
+def _iter_merged(sources) -> "generator":
+    """
+    Lazily merge sorted sources with a min heap of size k.
+
+    Ties are resolved by source order, so the merge is stable.
+
+    :param sources: iterable of ListNode chains, LinkedList objects or sorted iterables
+
+    :return: generator of (value, ListNode or None) pairs in sorted order
+
+    Time complexity: O(n log k)
+    """
+    min_heap = []
+    for index, source in enumerate(sources):
+        iterator = _iter_source_nodes(source)
+        for value, node in iterator:
+            min_heap.append((value, index, node, iterator))
+            break
+    heapq.heapify(min_heap)
+
+    while min_heap:
+        value, index, node, iterator = min_heap[0]
+        yield value, node
+        for next_value, next_node in iterator:
+            heapq.heapreplace(min_heap, (next_value, index, next_node, iterator))
+            break
+        else:
+            heapq.heappop(min_heap)
+
+def iter_merge_sorted(sources):
+    """
+    Lazily merge any number of sorted linked lists and iterators.
+
+    Values are yielded one by one, the merged output never exists in memory
+    as a whole: only one pending value per source is kept in the heap.
+
+    :param sources: iterable of ListNode chains, LinkedList objects or sorted iterables
+
+    :return: generator of values in sorted order
+
+    Time complexity: O(n log k)
+    """
+    for value, _ in _iter_merged(sources):
+        yield value
+
+def merge_k_sorted_lists(sources) -> ListNode:
+    """
+    Merge any number of sorted linked lists and iterators into one linked list.
+
+    Nodes of ListNode chains are relinked in place, values of other sources
+    are stored in new ListNode objects.
+
+    :param sources: iterable of ListNode chains, LinkedList objects or sorted iterables
+
+    :return: ListNode - head of the merged list
+
+    Time complexity: O(n log k)
+    """
+    dummy = ListNode()
+    tail = dummy
+    for value, node in _iter_merged(sources):
+        tail.next = node if node is not None else ListNode(value)
+        tail = tail.next
+    tail.next = None
+    return dummy.next
+
+def _to_node(storage: ArrayStorage, index: int) -> ArrayListNode:
+    """
+    Wrap a slot index into a node handle, -1 becomes None.
+    """
+    return ArrayListNode(storage, index) if index >= 0 else None
+
+def _reverse_indices(next_index: array, head: int) -> int:
+    """
+    Reverse an array-backed list working on slot indices directly.
+
+    :param next_index: array - next-pointers of the storage
+    :param head: int - slot index of the head
+
+    :return: int - slot index of the new head
+
+    Time complexity: O(n)
+    """
+    prev = -1
+    current = head
+    while current >= 0:
+        next_node = next_index[current]
+        next_index[current] = prev
+        prev = current
+        current = next_node
+    return prev
+
+def _merge_indices(values: array, next_index: array, left: int, right: int) -> int:
+    """
+    Merge two sorted array-backed lists working on slot indices directly.
+
+    :param values: array - values of the storage
+    :param next_index: array - next-pointers of the storage
+    :param left: int - slot index of the first list head
+    :param right: int - slot index of the second list head
+
+    :return: int - slot index of the merged list head
+
+    Time complexity: O(n)
+    """
+    head = tail = -1
+    while left >= 0 and right >= 0:
+        if values[left] <= values[right]:
+            node = left
+            left = next_index[left]
+        else:
+            node = right
+            right = next_index[right]
+        if tail < 0:
+            head = node
+        else:
+            next_index[tail] = node
+        tail = node
+
+    rest = left if left >= 0 else right
+    if tail < 0:
+        return rest
+    next_index[tail] = rest
+    return head
+
+def _merge_sort_indices(values: array, next_index: array, head: int) -> int:
+    """
+    Sort an array-backed list with merge sort working on slot indices directly.
+
+    :param values: array - values of the storage
+    :param next_index: array - next-pointers of the storage
+    :param head: int - slot index of the head
+
+    :return: int - slot index of the sorted list head
+
+    Time complexity: O(n log n)
+    """
+    if head < 0 or next_index[head] < 0:
+        return head
+
+    # Find the middle of the list
+    slow, fast = head, next_index[head]
+    while fast >= 0 and next_index[fast] >= 0:
+        slow = next_index[slow]
+        fast = next_index[next_index[fast]]
+
+    mid = next_index[slow]
+    next_index[slow] = -1
+
+    left = _merge_sort_indices(values, next_index, head)
+    right = _merge_sort_indices(values, next_index, mid)
+
+    return _merge_indices(values, next_index, left, right)
+
+def _find_runs_indices(values: array, next_index: array, head: int) -> list:
+    """
+    Split an array-backed list into sorted runs working on slot indices directly.
+
+    :param values: array - values of the storage
+    :param next_index: array - next-pointers of the storage
+    :param head: int - slot index of the head
+
+    :return: list - slot indices of the ascending run heads in list order
+
+    Time complexity: O(n)
+    """
+    runs = []
+    current = head
+    while current >= 0:
+        run_head = current
+        next_node = next_index[current]
+        if next_node >= 0 and values[next_node] < values[current]:
+            while next_node >= 0 and values[next_node] < values[current]:
+                current = next_node
+                next_node = next_index[current]
+            next_index[current] = -1
+            runs.append(_reverse_indices(next_index, run_head))
+        else:
+            while next_node >= 0 and values[next_node] >= values[current]:
+                current = next_node
+                next_node = next_index[current]
+            next_index[current] = -1
+            runs.append(run_head)
+        current = next_node
+    return runs
+
+def _merge_runs_indices(values: array, next_index: array, runs: list) -> int:
+    """
+    Merge neighbouring sorted array-backed runs pairwise until one run is left.
+
+    :param values: array - values of the storage
+    :param next_index: array - next-pointers of the storage
+    :param runs: list - slot indices of the run heads in list order
+
+    :return: int - slot index of the sorted list head
+
+    Time complexity: O(n log r), r - number of runs
+    """
+    if not runs:
+        return -1
+    while len(runs) > 1:
+        merged = [
+            _merge_indices(values, next_index, runs[i], runs[i + 1])
+            for i in range(0, len(runs) - 1, 2)
+        ]
+        if len(runs) % 2:
+            merged.append(runs[-1])
+        runs = merged
+    return runs[0]
+
 def print_list(head: ListNode) -> None:
     """
     Print the linked list.
@@ -165,6 +1154,32 @@ def print_list(head: ListNode) -> None:
         current = current.next
     print("None")
 
+def benchmark_storage(n: int = 200_000) -> None:
+    """
+    Compare memory and time of ListNode chains and array-backed storage.
+
+    :param n: int - number of values in the list
+
+    :return: None
+    """
+    values = [(i * 7919) % n for i in range(n)]
+    for storage in ("node", "array"):
+        tracemalloc.start()
+        start = time.perf_counter()
+        linked_list = LinkedList.from_values(values, storage)
+        build_time = time.perf_counter() - start
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        linked_list.head = merge_sort(linked_list.head)
+        sort_time = time.perf_counter() - start
+
+        print(
+            f"{storage:>5}: memory {memory / 2 ** 20:8.2f} MiB, "
+            f"build {build_time:.3f} s, merge_sort {sort_time:.3f} s"
+        )
+
 if __name__ == "__main__":
     # Create a linked list
     l1 = ListNode(1)
@@ -186,3 +1201,34 @@ if __name__ == "__main__":
     # Sort a linked list using merge sort
     sorted_list = merge_sort(reversed_list)
     print_list(sorted_list)
+
+    # Merge k sorted lists and iterators
+    shards = [
+        LinkedList.from_values([1, 5, 9]).head,
+        iter([2, 3, 10]),
+        LinkedList.from_values([0, 4], storage="array"),
+        range(6, 9),
+    ]
+    print_list(merge_k_sorted_lists(shards))
+
+    # Bottom-up merge sort of natural runs
+    print_list(merge_sort(LinkedList.from_values([1, 2, 3, 9, 7, 5, 4, 6]).head, mode="bottom_up"))
+
+    # Skip list index over a sorted list
+    indexed = LinkedList.from_values([1, 3, 5, 7, 9])
+    index = indexed.build_index(seed=42)
+    indexed.insert_sorted(4)
+    indexed.remove(7)
+    print(5 in indexed, 7 in indexed, list(index.irange(3, 9)))
+    print_list(indexed.head)
+
+    # External merge sort with a tiny memory budget
+    print_list(external_merge_sort([9, 1, 8, 2, 7, 3, 6, 4, 5], memory_limit=256))
+
+    # Array-backed storage works with the same functions
+    array_list = LinkedList.from_values([5, 3, 8, 1], storage="array")
+    print_list(merge_sort(array_list.head))
+
+    # Compare memory and time of both storages
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_storage()
@@ -14,11 +14,36 @@ The process is repeated recursively for each new square.
 The Pythagoras tree is a beautiful example of a fractal that
 can be created using simple geometric rules and recursion.
 
+For deep trees the recursion is replaced by a level-by-level engine:
+all branches of one level are computed in a single vectorized NumPy step
+and the whole tree is rendered as one LineCollection.
+
+Very deep trees can be rendered headless straight into a NumPy image buffer:
+subtrees whose branches are shorter than a pixel are pruned, and identical
+subtrees that start in the same sub-pixel cell with the same direction are
+computed only once, so the work is bounded by the image resolution.
+Run "python 2.pythagoras_tree.py out.png 30" to render level 30 into out.png
+without any prompt.
+
+For exporting the geometry the branches can also be streamed in fixed-size
+NumPy chunks: every branch is computed directly from its index, so memory
+stays constant for any level. The chunks can be written to a compact binary
+file that is read back through a memory map. Besides the line branches,
+the classic geometry made of squares is available.
+
 Time complexity:
 - draw_tree: O(2^n)
+- tree_segments: O(2^n) with O(n) NumPy operations
+- draw_tree_fast: O(2^n)
+- render_tree_raster: O(min(2^n, width * height))
+- iter_tree_segments: O(n * 2^n) with O(chunk_size * n) memory
 """
+import struct
+import sys
+import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.collections import LineCollection
 
 def draw_tree(x: float, y: float, angle: float, length: float, level: int, ax: plt.Axes) -> None:
     """
@@ -53,11 +78,354 @@ def draw_tree(x: float, y: float, angle: float, length: float, level: int, ax: p
     # Right branch
     draw_tree(x_end, y_end, angle - 45, new_length, level - 1, ax)
 
+def tree_segments(x: float, y: float, angle: float, length: float, level: int) -> np.ndarray:
+    """
+    Function to compute all branches of a Pythagoras tree level by level.
+
+    Every level is computed from the previous one in a single vectorized step:
+    the ends of the branches become the starts of their two children.
+
+    :param x: float
+    :param y: float
+    :param angle: float
+    :param length: float
+    :param level: int
+
+    :return: np.ndarray - array of shape (2^level - 1, 2, 2) with the start
+             and end point of every branch, ordered level by level
+
+    Time complexity: O(2^n)
+    """
+    segments = np.empty((max(2 ** level - 1, 0), 2, 2))
+    starts = np.array([[x, y]], dtype=float)
+    angles = np.array([np.radians(angle)])
+    offset = np.radians(45)
+    ratio = np.sqrt(2) / 2
+
+    for depth in range(level):
+        ends = starts + length * np.column_stack((np.cos(angles), np.sin(angles)))
+        level_segments = segments[2 ** depth - 1:2 ** (depth + 1) - 1]
+        level_segments[:, 0] = starts
+        level_segments[:, 1] = ends
+
+        # Left and right children of every branch start at its end
+        starts = np.repeat(ends, 2, axis=0)
+        angles = np.column_stack((angles + offset, angles - offset)).ravel()
+        length *= ratio
+
+    return segments
+
+def draw_tree_fast(x: float, y: float, angle: float, length: float, level: int, ax: plt.Axes) -> LineCollection:
+    """
+    Function to draw a Pythagoras tree with a single LineCollection.
+
+    :param x: float
+    :param y: float
+    :param angle: float
+    :param length: float
+    :param level: int
+    :param ax: Axes
+
+    :return: LineCollection - the collection added to the axes
+
+    Time complexity: O(2^n)
+    """
+    lines = LineCollection(tree_segments(x, y, angle, length, level), colors='k', linewidths=1)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    return lines
+
+def _tree_bounds(x: float, y: float, angle: float, length: float, level: int) -> tuple:
+    """
+    Function to estimate the bounding box of a Pythagoras tree.
+
+    The first levels are computed exactly, the rest of the tree cannot reach
+    further than the sum of the remaining branch lengths.
+
+    :return: tuple - (x_min, y_min, x_max, y_max)
+
+    Time complexity: O(1)
+    """
+    ratio = np.sqrt(2) / 2
+    exact_levels = min(level, 10)
+    points = tree_segments(x, y, angle, length, exact_levels).reshape(-1, 2)
+    reach = length * ratio ** exact_levels / (1 - ratio) if level > exact_levels else 0
+    x_min, y_min = points.min(axis=0) - reach
+    x_max, y_max = points.max(axis=0) + reach
+    return x_min, y_min, x_max, y_max
+
+def _rasterize_segments(image: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                        pixel_length: float, color: int, chunk_size: int = 2 ** 16) -> None:
+    """
+    Function to draw segments of the same length into an image buffer.
+
+    Every segment is sampled at one point per pixel of its length.
+
+    :param image: np.ndarray - image buffer of shape (height, width)
+    :param starts: np.ndarray - start points in pixel coordinates, shape (N, 2)
+    :param ends: np.ndarray - end points in pixel coordinates, shape (N, 2)
+    :param pixel_length: float - length of the segments in pixels
+    :param color: int - value to draw with
+    :param chunk_size: int - number of segments rasterized at once
+
+    :return: None
+
+    Time complexity: O(N * pixel_length)
+    """
+    height, width = image.shape
+    t = np.linspace(0, 1, int(np.ceil(pixel_length)) + 1)[None, :, None]
+    for begin in range(0, len(starts), chunk_size):
+        chunk_starts = starts[begin:begin + chunk_size, None, :]
+        chunk_ends = ends[begin:begin + chunk_size, None, :]
+        points = np.rint(chunk_starts + t * (chunk_ends - chunk_starts)).reshape(-1, 2).astype(np.int64)
+        inside = (points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)
+        points = points[inside]
+        image[height - 1 - points[:, 1], points[:, 0]] = color
+
+def render_tree_raster(x: float, y: float, angle: float, length: float, level: int,
+                       width: int = 1024, height: int = 1024, min_pixels: float = 1.0,
+                       background: int = 255, foreground: int = 0) -> np.ndarray:
+    """
+    Function to render a Pythagoras tree into a grayscale NumPy image buffer.
+
+    The tree is built level by level in pixel coordinates. The descent stops
+    once the branches become shorter than min_pixels, and branches that start
+    in the same quarter-pixel cell with the same direction are merged because
+    they grow identical subtrees.
+
+    :param x: float
+    :param y: float
+    :param angle: float
+    :param length: float
+    :param level: int
+    :param width: int - image width in pixels
+    :param height: int - image height in pixels
+    :param min_pixels: float - minimal projected branch length in pixels
+    :param background: int - background gray level
+    :param foreground: int - branch gray level
+
+    :return: np.ndarray - uint8 image of shape (height, width)
+
+    Time complexity: O(min(2^n, width * height))
+    """
+    image = np.full((height, width), background, dtype=np.uint8)
+    if level <= 0:
+        return image
+
+    x_min, y_min, x_max, y_max = _tree_bounds(x, y, angle, length, level)
+    scale = min((width - 1) / max(x_max - x_min, 1e-12), (height - 1) / max(y_max - y_min, 1e-12))
+    offset = np.array([
+        (width - 1 - (x_max - x_min) * scale) / 2 - x_min * scale,
+        (height - 1 - (y_max - y_min) * scale) / 2 - y_min * scale,
+    ])
+
+    starts = np.array([[x, y]]) * scale + offset
+    # Directions are stored as a number of 45 degree turns from the initial angle
+    turns = np.zeros(1, dtype=np.int64)
+    pixel_length = length * scale
+    ratio = np.sqrt(2) / 2
+
+    for _ in range(level):
+        if pixel_length < min_pixels:
+            break
+        angles = np.radians(angle + 45 * turns)
+        ends = starts + pixel_length * np.column_stack((np.cos(angles), np.sin(angles)))
+        _rasterize_segments(image, starts, ends, pixel_length, foreground)
+
+        # Children of all branches, duplicates grow identical subtrees
+        starts = np.repeat(ends, 2, axis=0)
+        turns = np.column_stack((turns + 1, turns - 1)).ravel() % 8
+        keys = np.column_stack((np.rint(starts * 4).astype(np.int64), turns))
+        _, unique = np.unique(keys, axis=0, return_index=True)
+        starts = starts[unique]
+        turns = turns[unique]
+        pixel_length *= ratio
+
+    return image
+
+def save_tree_png(path: str, x: float, y: float, angle: float, length: float, level: int, **kwargs) -> None:
+    """
+    Function to render a Pythagoras tree headless and save it as PNG.
+
+    :param path: str - output file path
+    :param x: float
+    :param y: float
+    :param angle: float
+    :param length: float
+    :param level: int
+    :param kwargs: keyword arguments of render_tree_raster
+
+    :return: None
+    """
+    image = render_tree_raster(x, y, angle, length, level, **kwargs)
+    mpimg.imsave(path, image, cmap='gray', vmin=0, vmax=255)
+
+def _direction_table(angle: float) -> np.ndarray:
+    """
+    Function to compute unit vectors of the 8 directions reachable from angle by 45 degree turns.
+
+    :param angle: float
+
+    :return: np.ndarray - array of shape (8, 2)
+    """
+    angles = np.radians(angle + 45 * np.arange(8))
+    return np.column_stack((np.cos(angles), np.sin(angles)))
+
+def _level_chunk(x: float, y: float, length: float, directions: np.ndarray, depth: int,
+                 first: int, last: int, geometry: str) -> np.ndarray:
+    """
+    Function to compute the branches with indices first..last-1 of one level.
+
+    The binary digits of a branch index describe its path from the root
+    (0 - left turn, 1 - right turn), so the branch is computed without its ancestors.
+
+    :param x: float
+    :param y: float
+    :param length: float
+    :param directions: np.ndarray - direction table of the root angle
+    :param depth: int - level of the branches, 0 for the root
+    :param first: int - index of the first branch in the level
+    :param last: int - index after the last branch in the level
+    :param geometry: str - "lines" or "squares"
+
+    :return: np.ndarray - array of shape (last - first, 2, 2) for lines
+             or (last - first, 4, 2) for squares
+
+    Time complexity: O((last - first) * depth)
+    """
+    index = np.arange(first, last, dtype=np.int64)
+    bits = (index[:, None] >> np.arange(depth - 1, -1, -1)) & 1
+    turns = np.zeros((len(index), depth + 1), dtype=np.int64)
+    turns[:, 1:] = np.cumsum(1 - 2 * bits, axis=1)
+    turns %= 8
+    lengths = length * (np.sqrt(2) / 2) ** np.arange(depth + 1)
+    growth = directions[turns]
+
+    if geometry == "lines":
+        start = np.array([x, y]) + (lengths[:depth, None] * growth[:, :depth]).sum(axis=1)
+        end = start + lengths[depth] * growth[:, depth]
+        return np.stack((start, end), axis=1)
+
+    # Base of a square is the growth direction turned by -90 degrees
+    base = directions[(turns - 2) % 8]
+    # The left child stands on the top-left corner of its parent,
+    # the right child on the apex of the triangle above the parent
+    steps = growth[:, :depth] + bits[:, :, None] * (base[:, :depth] + growth[:, :depth]) / 2
+    corner = np.array([x, y]) - lengths[0] * directions[6] / 2
+    start = corner + (lengths[:depth, None] * steps).sum(axis=1)
+    side = lengths[depth] * base[:, depth]
+    up = lengths[depth] * growth[:, depth]
+    return np.stack((start, start + side, start + side + up, start + up), axis=1)
+
+def iter_tree_segments(x: float, y: float, angle: float, length: float, level: int,
+                       chunk_size: int = 2 ** 14, geometry: str = "lines"):
+    """
+    Generator of Pythagoras tree geometry in fixed-size NumPy chunks.
+
+    The branches are produced level by level in the same order as
+    tree_segments, every chunk holds at most chunk_size branches.
+    With the "squares" geometry (x, y) is the middle of the base of the
+    root square, angle is its growth direction and length is its side.
+
+    :param x: float
+    :param y: float
+    :param angle: float
+    :param length: float
+    :param level: int
+    :param chunk_size: int - maximal number of branches in a chunk
+    :param geometry: str - "lines" for line branches, "squares" for squares
+
+    :return: generator of np.ndarray chunks of shape (k, 2, 2) for lines
+             or (k, 4, 2) for squares
+
+    Time complexity: O(n * 2^n) with O(chunk_size * n) memory
+    """
+    if geometry not in ("lines", "squares"):
+        raise ValueError(f"Unknown geometry: {geometry}")
+    directions = _direction_table(angle)
+    for depth in range(level):
+        for first in range(0, 2 ** depth, chunk_size):
+            last = min(first + chunk_size, 2 ** depth)
+            yield _level_chunk(x, y, length, directions, depth, first, last, geometry)
+
+# File header: magic, item size of the coordinates, points per shape, number of shapes
+_SEGMENTS_MAGIC = b"PYTHTREE"
+_SEGMENTS_HEADER = struct.Struct("<8sB3xIQ")
+
+def write_tree_segments(path: str, x: float, y: float, angle: float, length: float, level: int,
+                        chunk_size: int = 2 ** 14, geometry: str = "lines", dtype=np.float32) -> int:
+    """
+    Function to stream Pythagoras tree geometry into a binary file.
+
+    The file starts with a fixed-size header followed by little-endian
+    coordinates of shape (count, points, 2), so it can be memory-mapped.
+
+    :param path: str - output file path
+    :param x: float
+    :param y: float
+    :param angle: float
+    :param length: float
+    :param level: int
+    :param chunk_size: int - maximal number of branches in a chunk
+    :param geometry: str - "lines" or "squares"
+    :param dtype: np.float32 or np.float64 - coordinate type
+
+    :return: int - number of written shapes
+
+    Time complexity: O(n * 2^n) with O(chunk_size * n) memory
+    """
+    dtype = np.dtype(dtype).newbyteorder("<")
+    if dtype.kind != "f":
+        raise ValueError("Coordinates must be stored as floats")
+    # Checked before the file is opened, so an invalid call leaves no file behind
+    if geometry not in ("lines", "squares"):
+        raise ValueError(f"Unknown geometry: {geometry}")
+    points = 2 if geometry == "lines" else 4
+    count = 0
+    with open(path, "wb") as file:
+        file.write(_SEGMENTS_HEADER.pack(_SEGMENTS_MAGIC, dtype.itemsize, points, 0))
+        for chunk in iter_tree_segments(x, y, angle, length, level, chunk_size, geometry):
+            file.write(chunk.astype(dtype).tobytes())
+            count += len(chunk)
+        file.seek(0)
+        file.write(_SEGMENTS_HEADER.pack(_SEGMENTS_MAGIC, dtype.itemsize, points, count))
+    return count
+
+def read_tree_segments(path: str) -> np.ndarray:
+    """
+    Function to memory-map a file written by write_tree_segments.
+
+    :param path: str - file path
+
+    :return: np.memmap - read-only array of shape (count, points, 2)
+
+    Time complexity: O(1)
+    """
+    with open(path, "rb") as file:
+        header = file.read(_SEGMENTS_HEADER.size)
+    if len(header) < _SEGMENTS_HEADER.size:
+        raise ValueError(f"{path} is not a Pythagoras tree file")
+    magic, itemsize, points, count = _SEGMENTS_HEADER.unpack(header)
+    if magic != _SEGMENTS_MAGIC:
+        raise ValueError(f"{path} is not a Pythagoras tree file")
+    if count == 0:
+        return np.empty((0, points, 2), dtype=f"<f{itemsize}")
+    return np.memmap(path, dtype=f"<f{itemsize}", mode="r", offset=_SEGMENTS_HEADER.size,
+                     shape=(count, points, 2))
+
 if __name__ == '__main__':
+    # With an output path and a level the tree is rendered headless into a PNG file
+    if len(sys.argv) > 1:
+        if len(sys.argv) != 3:
+            sys.exit(f"Usage: python {sys.argv[0]} OUTPUT.png LEVEL")
+        save_tree_png(sys.argv[1], 0, 0, 90, 10, int(sys.argv[2]))
+        sys.exit()
+
+    level = int(input("Введіть рівень рекурсії: "))
+
     fig, ax = plt.subplots()
     ax.set_aspect('equal')
     ax.axis('off')  # Turn off the axis for a cleaner plot
 
-    level = int(input("Введіть рівень рекурсії: "))
-    draw_tree(0, 0, 90, 10, level, ax)  # Start from the origin (0, 0) with an angle of 90 degrees and a length of 10
+    draw_tree_fast(0, 0, 90, 10, level, ax)  # Start from the origin (0, 0) with an angle of 90 degrees and a length of 10
     plt.show()
@@ -16,12 +16,55 @@ and their distances.
 The priority queue is implemented using a min heap, which allows for efficient retrieval 
 of the vertex with the smallest distance.
 
+For large graphs the adjacency lists can be frozen into a compressed sparse row
+(CSR) representation: offsets, targets and weights are stored in typed arrays,
+and the edges of vertex u are targets[offsets[u]:offsets[u + 1]].
+
 Time complexity:
 - __init__: O(V)
 - add_edge: O(1)
 - dijkstra: O(E * log V)
+- shortest_path: O(E * log V) in the worst case, usually much less
+- CSRGraph.from_graph, CSRGraph.from_edges: O(V + E)
+- CSRGraph.save: O(V + E), CSRGraph.load: O(1) with memory-mapped arrays
+- CSRGraph.from_edge_list_file: O(E log E) in C-level bulk operations
+- batch_dijkstra: O(S * E * log V / P) for S sources on P processes
+- ShortestPathCache.get: O(V) on a hit, O(E * log V) on a miss
+- DynamicShortestPaths.edge_added: O(A * log A) for A vertices whose distance improves
+- ContractionHierarchy.build: offline preprocessing, roughly O(V * W) for witness search cost W
+- ContractionHierarchy.distance: a search over the small upward graphs only
+- ShortestPathServer: one dijkstra run per distinct source among concurrent requests
+
+The priority queue of dijkstra is pluggable:
+- "binary": binary heap with lazy deletion of outdated entries, O(E * log V)
+- "indexed": indexed binary heap with a true decrease-key, O(E * log V)
+- "dial": Dial's circular bucket queue for integer weights, O(E + V * C)
+- "radix": radix heap for integer weights, O(E + V * log C)
+where C is the maximal edge weight. "auto" picks one by the weight range.
+
+Running the script shows a small demo. The parallel batch run, the query
+server load test and the benchmarks run only with --benchmark:
+    python 3.dijkstra_algorithm.py --benchmark
 """
+import asyncio
 import heapq
+import json
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import weakref
+from array import array
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
 
 class Graph:
     """
@@ -30,15 +73,28 @@ class Graph:
     Attributes:
     - V: int - number of vertices in the graph
     - graph: dict - dictionary to store the graph
+    - version: int - counter incremented by every add_edge and decrease_edge call
+    - max_weight: int - maximal edge weight
+    - integer_weights: bool - all edge weights are non-negative integers
 
     Methods:
     - add_edge(u, v, weight): add an edge between vertices u and v with weight
-    - dijkstra(src): find the shortest path from source vertex src to all other vertices
+    - decrease_edge(u, v, weight): decrease the weight of an edge between u and v
+    - dijkstra(src, queue): find the shortest path from source vertex src to all other vertices
+    - shortest_path_tree(src): shortest distances and predecessors from src
+    - shortest_path(src, dst, mode, heuristic): find the shortest path from src to dst
+    - reverse_graph(): adjacency lists of the graph with reversed edges
+    - freeze(): build a frozen CSR copy of the graph
 
     Time complexity:
     - __init__: O(V)
     - add_edge: O(1)
+    - decrease_edge: O(deg(u))
     - dijkstra: O(E * log V)
+    - shortest_path_tree: O(E * log V)
+    - shortest_path: O(E * log V)
+    - reverse_graph: O(V + E), cached until the next add_edge
+    - freeze: O(V + E)
     """
     def __init__(self, vertices):
         """
@@ -52,32 +108,80 @@ class Graph:
         """
         self.V = vertices
         self.graph = {i: [] for i in range(vertices)}
+        self.version = 0
+        self.max_weight = 0
+        self.integer_weights = True
+        self._reverse = None
+        self._listeners = weakref.WeakSet()
 
     def add_edge(self, u, v, weight):
         """
         Add an edge between vertices u and v with weight.
 
+        Shortest path caches attached to the graph drop the entries the edge affects,
+        dynamic shortest path states repair the affected region.
+
         :param u: int - source vertex
         :param v: int - destination vertex
         :param weight: int - weight of the edge
 
         :return: None
 
-        Time complexity: O(1)
+        Time complexity: O(1) plus the work of the attached listeners
         """
         self.graph[u].append((v, weight))
+        self._edge_changed(u, v, weight)
 
-    def dijkstra(self, src):
+    def decrease_edge(self, u, v, weight):
+        """
+        Decrease the weight of the lightest edge between vertices u and v.
+
+        :param u: int - source vertex
+        :param v: int - destination vertex
+        :param weight: int - new weight of the edge, not greater than the current one
+
+        :return: None
+
+        Time complexity: O(deg(u)) plus the work of the attached listeners
+        """
+        edges = self.graph[u]
+        candidates = [i for i, (target, _) in enumerate(edges) if target == v]
+        if not candidates:
+            raise ValueError(f"There is no edge {u} -> {v}")
+        i = min(candidates, key=lambda j: edges[j][1])
+        if weight > edges[i][1]:
+            raise ValueError("decrease_edge cannot increase the weight")
+        edges[i] = (v, weight)
+        self._edge_changed(u, v, weight)
+
+    def _edge_changed(self, u, v, weight):
+        """
+        Update the bookkeeping after an edge u -> v got a smaller weight or was added.
+        """
+        self.version += 1
+        self.max_weight = max(self.max_weight, weight)
+        if not isinstance(weight, int) or weight < 0:
+            self.integer_weights = False
+        self._reverse = None
+        for listener in self._listeners:
+            listener.edge_added(u, v, weight)
+
+    def dijkstra(self, src, queue="auto"):
         """
         Find the shortest path from source vertex src to all other vertices.
 
         :param src: int - source vertex
+        :param queue: str - priority queue: "auto", "binary", "indexed", "dial" or "radix"
 
         :return: list - list of shortest distances from src to all other vertices
 
-        Time complexity: O(E * log V)
+        Time complexity: O(E * log V) with a binary heap
         """
-        
+        queue = select_queue(self.max_weight, self.integer_weights) if queue == "auto" else queue
+        if queue != "binary":
+            return _dijkstra_with_queue(self.graph, self.V, src,
+                                        make_queue(queue, self.V, self.max_weight, self.integer_weights))
+
         # Initialize the distance array with infinity
         dist = [float('inf')] * self.V
         dist[src] = 0
@@ -101,24 +205,1772 @@ class Graph:
 
         return dist
 
-if __name__ == "__main__":
-    g = Graph(9)
-    g.add_edge(0, 1, 4)
-    g.add_edge(0, 7, 8)
-    g.add_edge(1, 2, 8)
-    g.add_edge(1, 7, 11)
-    g.add_edge(2, 3, 7)
-    g.add_edge(2, 8, 2)
-    g.add_edge(2, 5, 4)
-    g.add_edge(3, 4, 9)
-    g.add_edge(3, 5, 14)
-    g.add_edge(4, 5, 10)
-    g.add_edge(5, 6, 2)
-    g.add_edge(6, 7, 1)
-    g.add_edge(6, 8, 6)
-    g.add_edge(7, 8, 7)
+    def shortest_path_tree(self, src):
+        """
+        Find the shortest distances and the shortest path tree from source vertex src.
 
-    dist = g.dijkstra(0)
-    print("Відстані від вершини 0 до всіх інших:")
-    for index, distance in enumerate(dist):
-        print(f"{index}: {distance}")
+        :param src: int - source vertex
+
+        :return: tuple - list of shortest distances and list of predecessors
+                 (None for src and unreachable vertices)
+
+        Time complexity: O(E * log V)
+        """
+        dist = [float('inf')] * self.V
+        pred = [None] * self.V
+        dist[src] = 0
+
+        min_heap = [(0, src)]
+        while min_heap:
+            current_dist, u = heapq.heappop(min_heap)
+            if current_dist > dist[u]:
+                continue
+
+            for v, weight in self.graph[u]:
+                if current_dist + weight < dist[v]:
+                    dist[v] = current_dist + weight
+                    pred[v] = u
+                    heapq.heappush(min_heap, (dist[v], v))
+
+        return dist, pred
+
+    def reverse_graph(self):
+        """
+        Build adjacency lists of the graph with reversed edges.
+
+        The result is cached until the next add_edge call.
+
+        :return: dict - dictionary of (u, weight) lists for every vertex v with an edge u -> v
+
+        Time complexity: O(V + E)
+        """
+        if self._reverse is None:
+            reverse = {i: [] for i in range(self.V)}
+            for u, edges in self.graph.items():
+                for v, weight in edges:
+                    reverse[v].append((u, weight))
+            self._reverse = reverse
+        return self._reverse
+
+    def shortest_path(self, src, dst, mode="dijkstra", heuristic=None):
+        """
+        Find the shortest path from source vertex src to destination vertex dst.
+
+        Modes:
+        - "dijkstra": Dijkstra's algorithm that stops once dst is settled
+        - "bidirectional": searches from src forwards and from dst backwards
+          over the reversed edges until the two searches meet
+        - "astar": A* search guided by heuristic(v, dst), an admissible
+          lower bound of the distance from v to dst
+
+        :param src: int - source vertex
+        :param dst: int - destination vertex
+        :param mode: str - "dijkstra", "bidirectional" or "astar"
+        :param heuristic: callable - heuristic(v, dst) for the "astar" mode
+
+        :return: tuple - shortest distance and list of vertices on the path,
+                 (inf, []) if dst is not reachable
+
+        Time complexity: O(E * log V)
+        """
+        if mode == "dijkstra":
+            return self._astar_path(src, dst, lambda v, target: 0)
+        if mode == "bidirectional":
+            return self._bidirectional_path(src, dst)
+        if mode == "astar":
+            if heuristic is None:
+                raise ValueError("The astar mode requires a heuristic")
+            return self._astar_path(src, dst, heuristic)
+        raise ValueError(f"Unknown shortest path mode: {mode}")
+
+    def _astar_path(self, src, dst, heuristic):
+        """
+        A* search from src to dst, Dijkstra's algorithm for a zero heuristic.
+
+        :param src: int - source vertex
+        :param dst: int - destination vertex
+        :param heuristic: callable - admissible heuristic(v, dst)
+
+        :return: tuple - shortest distance and path
+
+        Time complexity: O(E * log V)
+        """
+        dist = {src: 0}
+        pred = {src: None}
+        min_heap = [(heuristic(src, dst), 0, src)] # (estimate, distance, vertex)
+
+        while min_heap:
+            _, current_dist, u = heapq.heappop(min_heap)
+            if current_dist > dist[u]:
+                continue
+            if u == dst:
+                return current_dist, _build_path(pred, dst)
+
+            for v, weight in self.graph[u]:
+                new_dist = current_dist + weight
+                if new_dist < dist.get(v, float('inf')):
+                    dist[v] = new_dist
+                    pred[v] = u
+                    heapq.heappush(min_heap, (new_dist + heuristic(v, dst), new_dist, v))
+
+        return float('inf'), []
+
+    def _bidirectional_path(self, src, dst):
+        """
+        Bidirectional Dijkstra's algorithm from src to dst.
+
+        The searches alternate by the smaller queue top and stop when the sum
+        of both tops can no longer improve the best path found so far.
+
+        :param src: int - source vertex
+        :param dst: int - destination vertex
+
+        :return: tuple - shortest distance and path
+
+        Time complexity: O(E * log V)
+        """
+        if src == dst:
+            return 0, [src]
+
+        adjacency = (self.graph, self.reverse_graph())
+        dist = ({src: 0}, {dst: 0})
+        pred = ({src: None}, {dst: None})
+        heaps = ([(0, src)], [(0, dst)])
+        best, meeting = float('inf'), None
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            current_dist, u = heapq.heappop(heaps[side])
+            if current_dist > dist[side][u]:
+                continue
+
+            for v, weight in adjacency[side][u]:
+                new_dist = current_dist + weight
+                if new_dist < dist[side].get(v, float('inf')):
+                    dist[side][v] = new_dist
+                    pred[side][v] = u
+                    heapq.heappush(heaps[side], (new_dist, v))
+                    # A better connection between the two searches
+                    total = new_dist + dist[1 - side].get(v, float('inf'))
+                    if total < best:
+                        best, meeting = total, v
+
+        if meeting is None:
+            return float('inf'), []
+
+        path = _build_path(pred[0], meeting)
+        v = pred[1][meeting]
+        while v is not None:
+            path.append(v)
+            v = pred[1][v]
+        return best, path
+
+    def freeze(self):
+        """
+        Build a frozen CSR copy of the graph.
+
+        :return: CSRGraph - graph with the same edges in compressed sparse row form
+
+        Time complexity: O(V + E)
+        """
+        return CSRGraph.from_graph(self)
+
+class BinaryHeapQueue:
+    """
+    Binary heap with lazy deletion: a decreased key is pushed as a new entry
+    and the outdated entry is skipped by dijkstra when it is popped.
+
+    Time complexity:
+    - push: O(log n)
+    - pop: O(log n)
+    """
+    def __init__(self):
+        self.heap = []
+
+    def push(self, v, key):
+        heapq.heappush(self.heap, (key, v))
+
+    def pop(self):
+        return heapq.heappop(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
+
+class IndexedHeapQueue:
+    """
+    Indexed binary heap with a true decrease-key, every vertex is stored at most once.
+
+    Attributes:
+    - keys: list - heap of keys
+    - vertices: list - heap of vertices, parallel to keys
+    - position: list - position of every vertex in the heap, -1 if absent
+
+    Time complexity:
+    - push (insert or decrease-key): O(log n)
+    - pop: O(log n)
+    """
+    def __init__(self, vertices):
+        self.keys = []
+        self.vertices = []
+        self.position = [-1] * vertices
+
+    def push(self, v, key):
+        i = self.position[v]
+        if i < 0:
+            i = len(self.keys)
+            self.keys.append(key)
+            self.vertices.append(v)
+        elif key >= self.keys[i]:
+            return
+        self._sift_up(i, v, key)
+
+    def pop(self):
+        keys, vertices, position = self.keys, self.vertices, self.position
+        key, v = keys[0], vertices[0]
+        position[v] = -1
+        last_key, last_v = keys.pop(), vertices.pop()
+        if keys:
+            self._sift_down(0, last_v, last_key)
+        return key, v
+
+    def _sift_up(self, i, v, key):
+        keys, vertices, position = self.keys, self.vertices, self.position
+        while i > 0:
+            parent = (i - 1) >> 1
+            if keys[parent] <= key:
+                break
+            keys[i], vertices[i] = keys[parent], vertices[parent]
+            position[vertices[i]] = i
+            i = parent
+        keys[i], vertices[i] = key, v
+        position[v] = i
+
+    def _sift_down(self, i, v, key):
+        keys, vertices, position = self.keys, self.vertices, self.position
+        size = len(keys)
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and keys[child + 1] < keys[child]:
+                child += 1
+            if keys[child] >= key:
+                break
+            keys[i], vertices[i] = keys[child], vertices[child]
+            position[vertices[i]] = i
+            i = child
+        keys[i], vertices[i] = key, v
+        position[v] = i
+
+    def __bool__(self):
+        return bool(self.keys)
+
+class DialQueue:
+    """
+    Dial's bucket queue for non-negative integer keys.
+
+    In dijkstra all pending keys lie within [d, d + C] for the last popped key d,
+    so C + 1 circular buckets are enough. Outdated entries are skipped lazily.
+
+    Time complexity:
+    - push: O(1)
+    - pop: O(1) amortized plus O(C) for scanning empty buckets
+    """
+    def __init__(self, max_weight):
+        self.buckets = [[] for _ in range(max_weight + 1)]
+        self.current = 0
+        self.size = 0
+
+    def push(self, v, key):
+        self.buckets[key % len(self.buckets)].append((key, v))
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        count = len(buckets)
+        while not buckets[self.current % count]:
+            self.current += 1
+        self.size -= 1
+        key, v = buckets[self.current % count].pop()
+        return key, v
+
+    def __bool__(self):
+        return self.size > 0
+
+class RadixHeapQueue:
+    """
+    Radix heap for non-negative integer keys popped in non-decreasing order.
+
+    A key is stored in the bucket of the highest bit in which it differs from
+    the last popped key. When bucket 0 is empty, the lowest non-empty bucket is
+    redistributed around its minimum, every key moves to lower buckets only.
+
+    Time complexity:
+    - push: O(1)
+    - pop: O(log C) amortized
+    """
+    def __init__(self):
+        self.buckets = [[] for _ in range(65)]
+        self.last = 0
+        self.size = 0
+
+    def push(self, v, key):
+        self.buckets[(key ^ self.last).bit_length()].append((key, v))
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            bucket = buckets[i]
+            buckets[i] = []
+            last = min(bucket)[0]
+            self.last = last
+            for entry in bucket:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+        self.size -= 1
+        return buckets[0].pop()
+
+    def __bool__(self):
+        return self.size > 0
+
+QUEUES = ("binary", "indexed", "dial", "radix")
+
+# Maximal edge weight for which Dial's buckets beat the other queues, see benchmark_queues.
+# Above it heapq, implemented in C, beats the pure Python radix heap.
+DIAL_MAX_WEIGHT = 4096
+# Largest edge weight Dial's queue accepts, it keeps max_weight + 1 buckets
+DIAL_MAX_BUCKETS = 2 ** 20
+
+def select_queue(max_weight, integer_weights):
+    """
+    Pick the priority queue for dijkstra by the weight range.
+
+    :param max_weight: int - maximal edge weight
+    :param integer_weights: bool - all edge weights are non-negative integers
+
+    :return: str - name of the queue
+    """
+    if integer_weights and max_weight <= DIAL_MAX_WEIGHT:
+        return "dial"
+    return "binary"
+
+def make_queue(name, vertices, max_weight, integer_weights=True):
+    """
+    Create a priority queue for dijkstra.
+
+    :param name: str - "binary", "indexed", "dial" or "radix"
+    :param vertices: int - number of vertices in the graph
+    :param max_weight: int - maximal edge weight
+    :param integer_weights: bool - all edge weights are non-negative integers
+
+    :return: priority queue object with push(v, key), pop() and truth value
+    """
+    if name in ("dial", "radix") and not integer_weights:
+        raise ValueError(f"Priority queue {name!r} requires non-negative integer edge weights")
+    if name == "dial" and max_weight > DIAL_MAX_BUCKETS:
+        raise ValueError(f"Priority queue 'dial' supports edge weights up to {DIAL_MAX_BUCKETS}, "
+                         f"got {max_weight}, use 'radix' or 'binary'")
+    if name == "binary":
+        return BinaryHeapQueue()
+    if name == "indexed":
+        return IndexedHeapQueue(vertices)
+    if name == "dial":
+        return DialQueue(max_weight)
+    if name == "radix":
+        return RadixHeapQueue()
+    raise ValueError(f"Unknown priority queue: {name}")
+
+def _dijkstra_with_queue(adjacency, vertices, src, queue):
+    """
+    Dijkstra's algorithm over adjacency lists with a pluggable priority queue.
+
+    :param adjacency: dict - (v, weight) lists for every vertex
+    :param vertices: int - number of vertices
+    :param src: int - source vertex
+    :param queue: priority queue object
+
+    :return: list - list of shortest distances from src to all other vertices
+
+    Time complexity: depends on the queue
+    """
+    dist = [float('inf')] * vertices
+    dist[src] = 0
+    queue.push(src, 0)
+    push, pop = queue.push, queue.pop
+
+    while queue:
+        current_dist, u = pop()
+        if current_dist > dist[u]:
+            continue
+
+        for v, weight in adjacency[u]:
+            new_dist = current_dist + weight
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                push(v, new_dist)
+
+    return dist
+
+def _build_path(pred, dst):
+    """
+    Restore the path to dst from the predecessor mapping.
+
+    :param pred: dict - predecessor of every reached vertex, None for the source
+    :param dst: int - last vertex of the path
+
+    :return: list - vertices from the source to dst
+
+    Time complexity: O(V)
+    """
+    path = []
+    v = dst
+    while v is not None:
+        path.append(v)
+        v = pred[v]
+    path.reverse()
+    return path
+
+def euclidean_heuristic(coordinates):
+    """
+    Build an A* heuristic from vertex coordinates.
+
+    The heuristic is admissible when every edge weight is not less than
+    the Euclidean distance between its vertices.
+
+    :param coordinates: dict or list - (x, y) position of every vertex
+
+    :return: callable - heuristic(v, dst)
+    """
+    def heuristic(v, dst):
+        return math.dist(coordinates[v], coordinates[dst])
+    return heuristic
+
+def _weights_array(weights) -> array:
+    """
+    Store weights in a typed array: integers if possible, floats otherwise.
+
+    :param weights: iterable - edge weights
+
+    :return: array - array of typecode "q" or "d"
+    """
+    stored = array("q")
+    for weight in weights:
+        if stored.typecode == "q" and not isinstance(weight, int):
+            stored = array("d", stored)
+        stored.append(weight)
+    return stored
+
+class CSRGraph:
+    """
+    Class for representing a frozen graph in compressed sparse row form
+
+    Attributes:
+    - V: int - number of vertices in the graph
+    - offsets: array - offsets[u]..offsets[u + 1] is the range of edges of vertex u
+    - targets: array - destination vertex of every edge
+    - weights: array - weight of every edge
+
+    Methods:
+    - from_graph(graph): build from a Graph
+    - from_edges(vertices, edges): build from an iterable of (u, v, weight) edges
+    - from_edge_list_file(path, vertices): bulk import of a text edge list
+    - save(path): write the graph in the binary graph format
+    - load(path): memory-map a graph written by save
+    - dijkstra(src): find the shortest path from source vertex src to all other vertices
+
+    Binary graph format (little-endian):
+    - header: magic b"DIJKGRPH", format version (uint32), V (uint64), E (uint64),
+      weight typecode ("q" or "d"), padding to 32 bytes
+    - offsets: V + 1 int64 values
+    - targets: E int64 values
+    - weights: E int64 or float64 values
+
+    Time complexity:
+    - from_graph, from_edges: O(V + E)
+    - from_edge_list_file: O(E log E)
+    - save: O(V + E)
+    - load: O(1), pages are read on demand and shared between processes
+    - dijkstra: O(E * log V)
+    """
+    MAGIC = b"DIJKGRPH"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIQQc3x")
+
+    def __init__(self, vertices, offsets, targets, weights):
+        """
+        Initialize the graph from CSR arrays.
+
+        :param vertices: int - number of vertices in the graph
+        :param offsets: array - edge offsets of length V + 1
+        :param targets: array - destination vertices of length E
+        :param weights: array - weights of length E
+
+        :return: None
+
+        Time complexity: O(1)
+        """
+        if len(offsets) != vertices + 1 or len(targets) != len(weights) or offsets[-1] != len(targets):
+            raise ValueError("Inconsistent CSR arrays")
+        self.V = vertices
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Build a CSR graph from the adjacency lists of a Graph.
+
+        :param graph: Graph - source graph
+
+        :return: CSRGraph
+
+        Time complexity: O(V + E)
+        """
+        offsets = array("q", [0])
+        targets = array("q")
+        for u in range(graph.V):
+            for v, _ in graph.graph[u]:
+                targets.append(v)
+            offsets.append(len(targets))
+        weights = _weights_array(weight for u in range(graph.V) for _, weight in graph.graph[u])
+        return cls(graph.V, offsets, targets, weights)
+
+    @classmethod
+    def from_edges(cls, vertices, edges):
+        """
+        Build a CSR graph from an edge list with a counting sort by source vertex.
+
+        Edges of every vertex keep their order from the edge list.
+
+        :param vertices: int - number of vertices in the graph
+        :param edges: iterable - (u, v, weight) tuples
+
+        :return: CSRGraph
+
+        Time complexity: O(V + E)
+        """
+        sources = array("q")
+        destinations = array("q")
+        edge_weights = []
+        for u, v, weight in edges:
+            sources.append(u)
+            destinations.append(v)
+            edge_weights.append(weight)
+        edge_weights = _weights_array(edge_weights)
+
+        # Count the edges of every vertex and turn the counts into offsets
+        offsets = array("q", bytes(8 * (vertices + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for u in range(vertices):
+            offsets[u + 1] += offsets[u]
+
+        position = array("q", offsets)
+        targets = array("q", bytes(8 * len(sources)))
+        weights = array(edge_weights.typecode, bytes(edge_weights.itemsize * len(sources)))
+        for i, u in enumerate(sources):
+            j = position[u]
+            targets[j] = destinations[i]
+            weights[j] = edge_weights[i]
+            position[u] = j + 1
+
+        return cls(vertices, offsets, targets, weights)
+
+    @classmethod
+    def from_edge_list_file(cls, path, vertices=None, block_size=2 ** 24):
+        """
+        Import a text edge list with "u v weight" lines.
+
+        Lines starting with "#" are comments. The file is parsed in blocks with
+        bulk split, map and sort operations, so there are no Python-level
+        calls per edge.
+
+        :param path: str - text file path
+        :param vertices: int - number of vertices, the largest vertex id + 1 by default
+        :param block_size: int - approximate number of bytes parsed at once
+
+        :return: CSRGraph
+
+        Time complexity: O(E log E)
+        """
+        sources, destinations, edge_weights = array("q"), array("q"), array("q")
+        with open(path) as file:
+            while True:
+                lines = file.readlines(block_size)
+                if not lines:
+                    break
+                block = "".join(lines)
+                if "#" in block:
+                    block = "".join(line for line in lines if not line.lstrip().startswith("#"))
+                fields = block.split()
+                if len(fields) % 3:
+                    raise ValueError(f"{path} is not a list of 'u v weight' lines")
+                sources.extend(map(int, fields[0::3]))
+                destinations.extend(map(int, fields[1::3]))
+                try:
+                    block_weights = array(edge_weights.typecode, map(int, fields[2::3]))
+                except ValueError:
+                    block_weights = array("d", map(float, fields[2::3]))
+                if block_weights.typecode != edge_weights.typecode:
+                    edge_weights = array("d", edge_weights)
+                    block_weights = array("d", block_weights)
+                edge_weights.extend(block_weights)
+
+        if vertices is None:
+            vertices = max(max(sources, default=-1), max(destinations, default=-1)) + 1
+
+        # Stable sort of the edges by source vertex and offsets from the out-degrees
+        order = sorted(range(len(sources)), key=sources.__getitem__)
+        targets = array("q", map(destinations.__getitem__, order))
+        weights = array(edge_weights.typecode, map(edge_weights.__getitem__, order))
+        degrees = Counter(sources)
+        offsets = array("q", accumulate(map(degrees.__getitem__, range(vertices)), initial=0))
+        return cls(vertices, offsets, targets, weights)
+
+    def save(self, path):
+        """
+        Write the graph in the binary graph format.
+
+        :param path: str - file path
+
+        :return: None
+
+        Time complexity: O(V + E)
+        """
+        typecode = memoryview(self.weights).format
+        if typecode not in ("q", "d"):
+            raise ValueError(f"Unsupported weight type: {typecode}")
+        with open(path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.V, len(self.targets), typecode.encode()))
+            for part in (self.offsets, self.targets, self.weights):
+                file.write(memoryview(part))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-map a graph written by save.
+
+        The arrays are read-only views of the mapped file, so the graph is
+        queryable right away and its pages are shared by all processes that
+        load the same file.
+
+        :param path: str - file path
+
+        :return: CSRGraph
+
+        Time complexity: O(1)
+        """
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # The whole file is validated before any view is taken, so a rejected file can be unmapped
+        try:
+            if len(buffer) < cls.HEADER.size:
+                raise ValueError(f"{path} is not a binary graph file")
+            magic, version, vertices, edges, typecode = cls.HEADER.unpack_from(buffer)
+            if magic != cls.MAGIC or version != cls.VERSION or typecode not in (b"q", b"d"):
+                raise ValueError(f"{path} is not a binary graph file")
+            offsets_start = cls.HEADER.size
+            targets_start = offsets_start + 8 * (vertices + 1)
+            weights_start = targets_start + 8 * edges
+            weights_end = weights_start + 8 * edges
+            if len(buffer) < weights_end:
+                raise ValueError(f"{path} is truncated")
+        except BaseException:
+            buffer.close()
+            raise
+
+        view = memoryview(buffer)
+        graph = cls(
+            vertices,
+            view[offsets_start:targets_start].cast("q"),
+            view[targets_start:weights_start].cast("q"),
+            view[weights_start:weights_end].cast(typecode.decode()),
+        )
+        graph._buffer = buffer
+        return graph
+
+    def dijkstra(self, src):
+        """
+        Find the shortest path from source vertex src to all other vertices.
+
+        :param src: int - source vertex
+
+        :return: list - list of shortest distances from src to all other vertices
+
+        Time complexity: O(E * log V)
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        dist = [float('inf')] * self.V
+        dist[src] = 0
+
+        min_heap = [(0, src)]
+        while min_heap:
+            current_dist, u = heapq.heappop(min_heap)
+            if current_dist > dist[u]:
+                continue
+
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                new_dist = current_dist + weights[i]
+                if new_dist < dist[v]:
+                    dist[v] = new_dist
+                    heapq.heappush(min_heap, (new_dist, v))
+
+        return dist
+
+class ShortestPathCache:
+    """
+    LRU cache of shortest path trees of a Graph, keyed by source vertex
+
+    Distances and predecessors are stored in typed arrays, predecessor -1 for
+    none. Distances of graphs with integer weights are kept exact in int64
+    with -1 for unreachable vertices, other graphs use float distances. The
+    cache is attached to the graph: add_edge drops exactly the entries whose
+    distances the new edge can improve.
+
+    Attributes:
+    - graph: Graph - cached graph
+    - max_bytes: int - memory budget for the stored arrays
+    - hits, misses, evictions, invalidations: int - cache statistics
+
+    Methods:
+    - get(src): shortest distances and predecessors from src
+    - path(src, dst): shortest path from src to dst
+    - stats(): dictionary with the cache statistics
+    - clear(): drop all entries
+
+    Time complexity:
+    - get: O(V) on a hit to copy the tree, O(E * log V) on a miss
+    - path: O(1) on a hit plus O(V) for the path
+    - edge_added: O(C) for C cached entries
+    """
+    UNREACHABLE = -1
+
+    def __init__(self, graph, max_bytes=64 * 2 ** 20):
+        """
+        Initialize an empty cache and attach it to the graph.
+
+        :param graph: Graph - graph to cache
+        :param max_bytes: int - memory budget for the stored arrays
+
+        :return: None
+
+        Time complexity: O(1)
+        """
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        graph._listeners.add(self)
+
+    def _distance(self, dist, v):
+        """
+        Read a stored distance, int64 entries mark unreachable vertices with UNREACHABLE.
+        """
+        distance = dist[v]
+        if dist.typecode == "q" and distance == self.UNREACHABLE:
+            return float('inf')
+        return distance
+
+    def get(self, src):
+        """
+        Get the shortest distances and predecessors from source vertex src.
+
+        The result is a copy, changing it does not affect the cache.
+
+        :param src: int - source vertex
+
+        :return: tuple - list of distances as returned by Graph.dijkstra and
+                 array of predecessors (-1 for none)
+
+        Time complexity: O(V) on a hit, O(E * log V) on a miss
+        """
+        dist, pred = self._entry(src)
+        return [self._distance(dist, v) for v in range(len(dist))], array("q", pred)
+
+    def _entry(self, src):
+        """
+        Find the stored entry of src, computing and storing it on a miss.
+        """
+        entry = self._entries.get(src)
+        if entry is not None:
+            self._entries.move_to_end(src)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        dist, pred = self.graph.shortest_path_tree(src)
+        stored = None
+        if self.graph.integer_weights:
+            try:
+                stored = array("q", (self.UNREACHABLE if d == float('inf') else d for d in dist))
+            except OverflowError:
+                pass
+        if stored is None:
+            stored = array("d", dist)
+        entry = (stored, array("q", (-1 if u is None else u for u in pred)))
+        size = _entry_bytes(entry)
+        if size <= self.max_bytes:
+            while self._bytes + size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[src] = entry
+            self._bytes += size
+        return entry
+
+    def path(self, src, dst):
+        """
+        Find the shortest path from src to dst using the cached tree of src.
+
+        :param src: int - source vertex
+        :param dst: int - destination vertex
+
+        :return: tuple - shortest distance and list of vertices on the path,
+                 (inf, []) if dst is not reachable
+
+        Time complexity: O(1) on a hit plus O(V) for the path
+        """
+        dist, pred = self._entry(src)
+        distance = self._distance(dist, dst)
+        if distance == float('inf'):
+            return distance, []
+        path = [dst]
+        while pred[path[-1]] >= 0:
+            path.append(pred[path[-1]])
+        path.reverse()
+        return distance, path
+
+    def edge_added(self, u, v, weight):
+        """
+        Drop the cached trees whose distances an added edge u -> v improves.
+
+        :param u: int - source vertex of the edge
+        :param v: int - destination vertex of the edge
+        :param weight: int - weight of the edge
+
+        :return: None
+
+        Time complexity: O(C) for C cached entries
+        """
+        for src in [src for src, (dist, _) in self._entries.items()
+                    if self._distance(dist, u) + weight < self._distance(dist, v)]:
+            self._drop(src)
+            self.invalidations += 1
+
+    def _drop(self, src):
+        self._bytes -= _entry_bytes(self._entries.pop(src))
+
+    def clear(self):
+        """
+        Drop all cached entries, the statistics are kept.
+
+        :return: None
+        """
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        :return: dict - hits, misses, hit rate, evictions, invalidations, entries and bytes
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+def _entry_bytes(entry):
+    """
+    Memory used by the arrays of a cache entry.
+    """
+    return sum(len(part) * part.itemsize for part in entry)
+
+class DynamicShortestPaths:
+    """
+    Shortest distances and predecessors from one source kept up to date under edge updates
+
+    The state is attached to the graph: after add_edge or decrease_edge only
+    the vertices whose distances the changed edge improves are relaxed again,
+    starting from the head of the edge, instead of a full dijkstra rerun.
+
+    Attributes:
+    - graph: Graph - the graph
+    - src: int - source vertex
+    - dist: list - shortest distances from src
+    - pred: list - predecessors on the shortest paths, None for src and unreachable vertices
+    - updated: int - number of distance updates done by repairs
+
+    Methods:
+    - edge_added(u, v, weight): repair the state after an edge insertion or weight decrease
+    - path(dst): shortest path from src to dst
+
+    Time complexity:
+    - __init__: O(E * log V)
+    - edge_added: O(A * log A) for A vertices whose distance improves
+    """
+    def __init__(self, graph, src):
+        """
+        Compute the initial state and attach it to the graph.
+
+        :param graph: Graph - the graph
+        :param src: int - source vertex
+
+        :return: None
+
+        Time complexity: O(E * log V)
+        """
+        self.graph = graph
+        self.src = src
+        self.dist, self.pred = graph.shortest_path_tree(src)
+        self.updated = 0
+        graph._listeners.add(self)
+
+    def edge_added(self, u, v, weight):
+        """
+        Repair the state after an edge u -> v was added or its weight decreased.
+
+        :param u: int - source vertex of the edge
+        :param v: int - destination vertex of the edge
+        :param weight: int - new weight of the edge
+
+        :return: None
+
+        Time complexity: O(A * log A) for A vertices whose distance improves
+        """
+        dist, pred, adjacency = self.dist, self.pred, self.graph.graph
+        if not dist[u] + weight < dist[v]:
+            return
+
+        dist[v] = dist[u] + weight
+        pred[v] = u
+        self.updated += 1
+        min_heap = [(dist[v], v)]
+        while min_heap:
+            current_dist, x = heapq.heappop(min_heap)
+            if current_dist > dist[x]:
+                continue
+            for y, edge_weight in adjacency[x]:
+                if current_dist + edge_weight < dist[y]:
+                    dist[y] = current_dist + edge_weight
+                    pred[y] = x
+                    self.updated += 1
+                    heapq.heappush(min_heap, (dist[y], y))
+
+    def path(self, dst):
+        """
+        Restore the shortest path from src to dst.
+
+        :param dst: int - destination vertex
+
+        :return: tuple - shortest distance and list of vertices on the path,
+                 (inf, []) if dst is not reachable
+
+        Time complexity: O(V)
+        """
+        if self.dist[dst] == float('inf'):
+            return self.dist[dst], []
+        return self.dist[dst], _build_path(self.pred, dst)
+
+def check_dynamic_updates(trials=200, seed=0):
+    """
+    Check DynamicShortestPaths against a full recomputation on random update sequences.
+
+    :param trials: int - number of random graphs
+    :param seed: int - random seed
+
+    :return: int - number of checked updates
+
+    Time complexity: O(trials * updates * E * log V)
+    """
+    rng = random.Random(seed)
+    checked = 0
+    for _ in range(trials):
+        vertices = rng.randint(1, 20)
+        graph = Graph(vertices)
+        for u, v, weight in random_edges(vertices, rng.randint(0, 3 * vertices), 20, rng.random()):
+            graph.add_edge(u, v, weight)
+        state = DynamicShortestPaths(graph, rng.randrange(vertices))
+
+        for _ in range(rng.randint(1, 30)):
+            u = rng.randrange(vertices)
+            if graph.graph[u] and rng.random() < 0.5:
+                v, _ = rng.choice(graph.graph[u])
+                weight = min(w for x, w in graph.graph[u] if x == v)
+                graph.decrease_edge(u, v, rng.randint(0, weight))
+            else:
+                graph.add_edge(u, rng.randrange(vertices), rng.randint(0, 20))
+
+            dist, _ = graph.shortest_path_tree(state.src)
+            if state.dist != dist:
+                raise AssertionError("Incremental distances differ from full recomputation")
+            for v in range(vertices):
+                distance, path = state.path(v)
+                if not path:
+                    continue
+                if path[0] != state.src or path[-1] != v:
+                    raise AssertionError(f"Path {path} does not lead from {state.src} to {v}")
+                if sum(min(w for x, w in graph.graph[a] if x == b)
+                       for a, b in zip(path, path[1:])) != distance:
+                    raise AssertionError(f"Length of path {path} differs from its distance {distance}")
+            checked += 1
+    return checked
+
+def _witness_search(out_edges, source, excluded, max_dist, settle_limit):
+    """
+    Limited Dijkstra's algorithm used to look for witness paths during contraction.
+
+    :param out_edges: list - dictionaries of outgoing edges of the remaining graph
+    :param source: int - start vertex
+    :param excluded: int - vertex being contracted
+    :param max_dist: int - distance after which the search stops
+    :param settle_limit: int - maximal number of settled vertices
+
+    :return: dict - upper bounds of the distances from source
+
+    Time complexity: O(settle_limit * log settle_limit) on bounded degree graphs
+    """
+    dist = {source: 0}
+    min_heap = [(0, source)]
+    settled = 0
+    while min_heap and settled < settle_limit:
+        current_dist, u = heapq.heappop(min_heap)
+        if current_dist > dist[u]:
+            continue
+        if current_dist > max_dist:
+            break
+        settled += 1
+        for v, weight in out_edges[u].items():
+            if v == excluded:
+                continue
+            new_dist = current_dist + weight
+            if new_dist < dist.get(v, float('inf')):
+                dist[v] = new_dist
+                heapq.heappush(min_heap, (new_dist, v))
+    return dist
+
+def _csr_from_dicts(adjacency):
+    """
+    Pack a list of {target: weight} dictionaries into CSR arrays.
+
+    :param adjacency: list - dictionary of edges for every vertex
+
+    :return: tuple - offsets, targets and weights arrays
+    """
+    offsets = array("q", [0])
+    targets = array("q")
+    for edges in adjacency:
+        targets.extend(edges)
+        offsets.append(len(targets))
+    weights = _weights_array(weight for edges in adjacency for weight in edges.values())
+    return offsets, targets, weights
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy of a Graph for fast point-to-point distance queries
+
+    Preprocessing contracts the vertices one by one in the order of importance.
+    A contracted vertex is removed from the graph and shortcut edges keep the
+    distances between its neighbours unless a witness path exists without it.
+    A query runs two Dijkstra searches that only go up in the order:
+    forwards from the source and backwards from the destination.
+
+    The hierarchy is stored as two CSR graphs of upward edges and can be
+    saved to and loaded from a binary file.
+
+    Attributes:
+    - V: int - number of vertices
+    - rank: array - contraction order of every vertex
+    - forward: tuple - CSR arrays of the edges u -> v with rank[v] > rank[u]
+    - backward: tuple - CSR arrays of the reversed edges v <- u with rank[u] > rank[v]
+
+    Methods:
+    - build(graph, settle_limit): preprocess a Graph
+    - distance(src, dst): shortest distance from src to dst
+    - save(path), load(path): binary serialization
+
+    Time complexity:
+    - build: offline, depends on the graph structure
+    - distance: O(U * log U) for U vertices reachable upwards from src and dst
+    """
+    MAGIC = b"DIJKSTCH"
+    HEADER = struct.Struct("<8sQQQc")
+
+    def __init__(self, vertices, rank, forward, backward):
+        """
+        Initialize the hierarchy from its arrays.
+
+        :param vertices: int - number of vertices
+        :param rank: array - contraction order of every vertex
+        :param forward: tuple - offsets, targets and weights of the upward edges
+        :param backward: tuple - offsets, targets and weights of the reversed upward edges
+
+        :return: None
+        """
+        self.V = vertices
+        self.rank = rank
+        self.forward = forward
+        self.backward = backward
+
+    @classmethod
+    def build(cls, graph, settle_limit=64):
+        """
+        Contract all vertices of a graph.
+
+        Vertices are ordered by a lazily updated priority: the edge difference
+        (shortcuts added minus edges removed) plus the number of contracted neighbours.
+
+        :param graph: Graph - graph to preprocess
+        :param settle_limit: int - vertices settled by one witness search,
+                             lower values speed up preprocessing but add more shortcuts
+
+        :return: ContractionHierarchy
+
+        Time complexity: offline, depends on the graph structure
+        """
+        vertices = graph.V
+        out_edges = [{} for _ in range(vertices)]
+        in_edges = [{} for _ in range(vertices)]
+        for u, edges in graph.graph.items():
+            for v, weight in edges:
+                if u != v and weight < out_edges[u].get(v, float('inf')):
+                    out_edges[u][v] = weight
+                    in_edges[v][u] = weight
+
+        def shortcuts(v):
+            needed = []
+            for u, weight_in in in_edges[v].items():
+                candidates = {x: weight_in + weight_out for x, weight_out in out_edges[v].items() if x != u}
+                if not candidates:
+                    continue
+                dist = _witness_search(out_edges, u, v, max(candidates.values()), settle_limit)
+                for x, weight in candidates.items():
+                    if dist.get(x, float('inf')) > weight:
+                        needed.append((u, x, weight))
+            return needed
+
+        contracted_neighbours = [0] * vertices
+
+        def priority(v, needed):
+            return len(needed) - len(in_edges[v]) - len(out_edges[v]) + contracted_neighbours[v]
+
+        queue = [(priority(v, shortcuts(v)), v) for v in range(vertices)]
+        heapq.heapify(queue)
+        rank = array("q", bytes(8 * vertices))
+        up_forward = [None] * vertices
+        up_backward = [None] * vertices
+        order = 0
+
+        while queue:
+            _, v = heapq.heappop(queue)
+            # Lazy update: contract v only if it is still the least important vertex
+            needed = shortcuts(v)
+            current = priority(v, needed)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            rank[v] = order
+            order += 1
+            for u, x, weight in needed:
+                if weight < out_edges[u].get(x, float('inf')):
+                    out_edges[u][x] = weight
+                    in_edges[x][u] = weight
+
+            up_forward[v] = out_edges[v]
+            up_backward[v] = in_edges[v]
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                contracted_neighbours[u] += 1
+            for x in out_edges[v]:
+                del in_edges[x][v]
+                contracted_neighbours[x] += 1
+            out_edges[v] = {}
+            in_edges[v] = {}
+
+        return cls(vertices, rank, _csr_from_dicts(up_forward), _csr_from_dicts(up_backward))
+
+    def distance(self, src, dst):
+        """
+        Find the shortest distance from src to dst.
+
+        Both upward searches run by the smaller queue top and stop once
+        the top is not less than the best distance found so far.
+
+        :param src: int - source vertex
+        :param dst: int - destination vertex
+
+        :return: int - shortest distance, inf if dst is not reachable
+
+        Time complexity: O(U * log U) for U vertices reachable upwards from src and dst
+        """
+        graphs = (self.forward, self.backward)
+        dist = ({src: 0}, {dst: 0})
+        heaps = ([(0, src)], [(0, dst)])
+        best = 0 if src == dst else float('inf')
+
+        while heaps[0] or heaps[1]:
+            if not heaps[1] or (heaps[0] and heaps[0][0][0] <= heaps[1][0][0]):
+                side = 0
+            else:
+                side = 1
+            current_dist, u = heapq.heappop(heaps[side])
+            if current_dist >= best:
+                break
+            if current_dist > dist[side][u]:
+                continue
+
+            offsets, targets, weights = graphs[side]
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                new_dist = current_dist + weights[i]
+                if new_dist < dist[side].get(v, float('inf')):
+                    dist[side][v] = new_dist
+                    heapq.heappush(heaps[side], (new_dist, v))
+                    best = min(best, new_dist + dist[1 - side].get(v, float('inf')))
+
+        return best
+
+    def save(self, path):
+        """
+        Save the hierarchy to a binary file.
+
+        :param path: str - file path
+
+        :return: None
+        """
+        forward_offsets, forward_targets, forward_weights = self.forward
+        backward_offsets, backward_targets, backward_weights = self.backward
+        if forward_weights.typecode != backward_weights.typecode:
+            forward_weights, backward_weights = array("d", forward_weights), array("d", backward_weights)
+        with open(path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.V, len(forward_targets), len(backward_targets),
+                                        forward_weights.typecode.encode()))
+            for part in (self.rank, forward_offsets, forward_targets, forward_weights,
+                         backward_offsets, backward_targets, backward_weights):
+                part.tofile(file)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a hierarchy saved by save().
+
+        :param path: str - file path
+
+        :return: ContractionHierarchy
+        """
+        with open(path, "rb") as file:
+            magic, vertices, forward_edges, backward_edges, typecode = cls.HEADER.unpack(
+                file.read(cls.HEADER.size))
+            if magic != cls.MAGIC:
+                raise ValueError(f"{path} is not a contraction hierarchy file")
+            typecode = typecode.decode()
+
+            def read(code, count):
+                part = array(code)
+                part.fromfile(file, count)
+                return part
+
+            rank = read("q", vertices)
+            forward = (read("q", vertices + 1), read("q", forward_edges), read(typecode, forward_edges))
+            backward = (read("q", vertices + 1), read("q", backward_edges), read(typecode, backward_edges))
+        return cls(vertices, rank, forward, backward)
+
+def _share_csr(csr):
+    """
+    Copy the CSR arrays of a graph into one shared memory block.
+
+    :param csr: CSRGraph - graph to share
+
+    :return: tuple - SharedMemory block and layout (V, number of edges, weight typecode)
+    """
+    parts = [memoryview(csr.offsets).cast("B"), memoryview(csr.targets).cast("B"),
+             memoryview(csr.weights).cast("B")]
+    shm = SharedMemory(create=True, size=max(sum(part.nbytes for part in parts), 1))
+    position = 0
+    for part in parts:
+        shm.buf[position:position + part.nbytes] = part
+        position += part.nbytes
+    return shm, (csr.V, len(csr.targets), memoryview(csr.weights).format)
+
+def _attach_csr(shm, layout):
+    """
+    Build a CSRGraph over the arrays stored in a shared memory block without copying.
+
+    :param shm: SharedMemory - block created by _share_csr
+    :param layout: tuple - layout returned by _share_csr
+
+    :return: CSRGraph - graph backed by memoryviews of the block
+    """
+    vertices, edges, typecode = layout
+    offsets_end = 8 * (vertices + 1)
+    targets_end = offsets_end + 8 * edges
+    weights_end = targets_end + array(typecode).itemsize * edges
+    offsets = shm.buf[:offsets_end].cast("q")
+    targets = shm.buf[offsets_end:targets_end].cast("q")
+    weights = shm.buf[targets_end:weights_end].cast(typecode)
+    return CSRGraph(vertices, offsets, targets, weights)
+
+# Graph of a batch worker process, attached once by _init_batch_worker
+_worker_shm = None
+_worker_graph = None
+
+def _init_batch_worker(name, layout):
+    """
+    Attach a batch worker to the shared graph.
+
+    :param name: str - name of the shared memory block
+    :param layout: tuple - layout returned by _share_csr
+
+    :return: None
+    """
+    global _worker_shm, _worker_graph
+    _worker_shm = SharedMemory(name=name)
+    _worker_graph = _attach_csr(_worker_shm, layout)
+
+def _batch_worker_dijkstra(src):
+    return src, _worker_graph.dijkstra(src)
+
+def iter_batch_dijkstra(graph, sources, processes=None, chunksize=1):
+    """
+    Run dijkstra for many sources on a process pool and yield results as they are ready.
+
+    The graph is frozen to CSR form and placed in shared memory once, workers
+    attach to it instead of receiving a pickled copy with every task.
+    Results are yielded in the order of sources.
+
+    :param graph: Graph or CSRGraph - graph to search
+    :param sources: iterable - source vertices
+    :param processes: int - number of worker processes, os.cpu_count() by default
+    :param chunksize: int - number of sources sent to a worker at once
+
+    :return: generator of (src, list of shortest distances) tuples
+
+    Time complexity: O(S * E * log V / P)
+    """
+    csr = graph if isinstance(graph, CSRGraph) else graph.freeze()
+    shm, layout = _share_csr(csr)
+    try:
+        with Pool(processes, initializer=_init_batch_worker, initargs=(shm.name, layout)) as pool:
+            yield from pool.imap(_batch_worker_dijkstra, sources, chunksize)
+    finally:
+        shm.close()
+        shm.unlink()
+
+def batch_dijkstra(graph, sources, processes=None, chunksize=1):
+    """
+    Run dijkstra for many sources on a process pool.
+
+    :param graph: Graph or CSRGraph - graph to search
+    :param sources: iterable - source vertices
+    :param processes: int - number of worker processes, os.cpu_count() by default
+    :param chunksize: int - number of sources sent to a worker at once
+
+    :return: list - dense distance matrix, one row per source in the order of sources
+
+    Time complexity: O(S * E * log V / P)
+    """
+    return [dist for _, dist in iter_batch_dijkstra(graph, sources, processes, chunksize)]
+
+def random_edges(vertices, edges, max_weight=100, seed=0):
+    """
+    Generate a random directed edge list.
+
+    :param vertices: int - number of vertices
+    :param edges: int - number of edges
+    :param max_weight: int - maximal edge weight
+    :param seed: int - random seed
+
+    :return: list - list of (u, v, weight) tuples
+    """
+    rng = random.Random(seed)
+    return [
+        (rng.randrange(vertices), rng.randrange(vertices), rng.randint(1, max_weight))
+        for _ in range(edges)
+    ]
+
+def benchmark_backends(vertices=50_000, edges=300_000, sources=3):
+    """
+    Compare memory and runtime of the dict and CSR graph backends.
+
+    :param vertices: int - number of vertices
+    :param edges: int - number of edges
+    :param sources: int - number of dijkstra runs
+
+    :return: None
+    """
+    edge_list = random_edges(vertices, edges)
+
+    tracemalloc.start()
+    graph = Graph(vertices)
+    for u, v, weight in edge_list:
+        graph.add_edge(u, v, weight)
+    dict_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    csr = CSRGraph.from_edges(vertices, edge_list)
+    csr_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Both backends use the binary heap, so only the graph representation differs
+    runs = (
+        ("dict", lambda src: graph.dijkstra(src, queue="binary"), dict_memory),
+        ("csr", csr.dijkstra, csr_memory),
+    )
+    for name, run, memory in runs:
+        start = time.perf_counter()
+        for src in range(sources):
+            run(src)
+        elapsed = (time.perf_counter() - start) / sources
+        print(f"{name:>4}: пам'ять {memory / 2 ** 20:8.2f} MiB, dijkstra {elapsed:.3f} с")
+
+def benchmark_batch(vertices=20_000, edges=100_000, sources=64, processes=None):
+    """
+    Measure the scaling of batch_dijkstra with the number of processes.
+
+    The speedup is reported relative to the first process count.
+
+    :param vertices: int - number of vertices
+    :param edges: int - number of edges
+    :param sources: int - number of sources in the batch
+    :param processes: list - process counts to measure, powers of two up to os.cpu_count() by default
+
+    :return: None
+    """
+    csr = CSRGraph.from_edges(vertices, random_edges(vertices, edges))
+    if processes is None:
+        processes = [2 ** i for i in range((os.cpu_count() or 1).bit_length())]
+
+    baseline = None
+    for count in processes:
+        start = time.perf_counter()
+        batch_dijkstra(csr, range(sources), processes=count)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{count:>3} процесів: {elapsed:.3f} с, прискорення {baseline / elapsed:.2f}x")
+
+def benchmark_queues(vertices=20_000, edges=120_000, max_weights=(1, 16, 256, 4096, 65536, 2 ** 20)):
+    """
+    Compare the priority queues of dijkstra across weight ranges.
+
+    Dial's queue is skipped above DIAL_MAX_BUCKETS where its buckets take too much memory.
+
+    :param vertices: int - number of vertices
+    :param edges: int - number of edges
+    :param max_weights: tuple - maximal edge weights to measure
+
+    :return: None
+    """
+    print("C".rjust(8) + "".join(name.rjust(10) for name in QUEUES) + "    auto")
+    for max_weight in max_weights:
+        graph = Graph(vertices)
+        for u, v, weight in random_edges(vertices, edges, max_weight):
+            graph.add_edge(u, v, weight)
+
+        timings = []
+        for name in QUEUES:
+            if name == "dial" and max_weight > DIAL_MAX_BUCKETS:
+                timings.append("-".rjust(10))
+                continue
+            start = time.perf_counter()
+            graph.dijkstra(0, queue=name)
+            timings.append(f"{time.perf_counter() - start:>10.3f}")
+        auto = select_queue(graph.max_weight, graph.integer_weights)
+        print(f"{max_weight:>8}" + "".join(timings) + f"    {auto}")
+
+def _percentiles(samples, points=(50, 90, 99)):
+    """
+    Nearest-rank percentiles of a sample.
+
+    :param samples: iterable - measured values
+    :param points: tuple - percentiles to compute
+
+    :return: dict - {"p50": value, ...}, empty if there are no samples
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {f"p{point}": ordered[max(math.ceil(point / 100 * len(ordered)) - 1, 0)] for point in points}
+
+class ShortestPathServer:
+    """
+    Asyncio server answering shortest distance queries over one loaded graph
+
+    Protocol: one request per line, "src dst" is answered with the distance
+    ("inf" if dst is not reachable), "stats" with a JSON line of statistics.
+
+    Concurrent requests with the same source share one dijkstra run: the run
+    starts after a short batching window and every request for that source
+    arriving before it finishes waits for the same result. The searches run
+    in a thread pool, so the event loop keeps accepting requests.
+
+    Attributes:
+    - graph: Graph or CSRGraph - graph to query
+    - batch_window: float - seconds to wait for more requests before a run
+    - searches: int - number of dijkstra runs
+    - requests: int - number of answered requests
+
+    Methods:
+    - start(host, port, path): start listening on TCP or on a Unix socket
+    - distance(src, dst): answer one query
+    - stats(): request counts and latency percentiles in milliseconds
+    - close(): stop the server
+
+    Time complexity:
+    - distance: O(E * log V) per distinct source in a batch, O(1) for the rest
+    """
+    def __init__(self, graph, batch_window=0.001, max_workers=None, latency_samples=100_000):
+        """
+        Initialize the server.
+
+        :param graph: Graph or CSRGraph - graph to query
+        :param batch_window: float - seconds to wait for more requests before a run
+        :param max_workers: int - number of search threads
+        :param latency_samples: int - number of recent latencies kept for percentiles
+
+        :return: None
+        """
+        self.graph = graph
+        self.batch_window = batch_window
+        self.searches = 0
+        self.requests = 0
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._inflight = {}
+        self._latencies = deque(maxlen=latency_samples)
+        self._server = None
+        self._handlers = set()
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """
+        Start listening on localhost TCP or on a Unix socket.
+
+        :param host: str - TCP host
+        :param port: int - TCP port, 0 picks a free one
+        :param path: str - Unix socket path, used instead of TCP if given
+
+        :return: tuple - (host, port) or the socket path
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+            return path
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """
+        Stop the server and its search threads.
+
+        :return: None
+        """
+        if self._server is not None:
+            self._server.close()
+            for handler in list(self._handlers):
+                handler.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    async def distance(self, src, dst):
+        """
+        Answer one query, sharing the dijkstra run with other requests for src.
+
+        :param src: int - source vertex
+        :param dst: int - destination vertex
+
+        :return: int - shortest distance from src to dst
+
+        Time complexity: O(E * log V) for the first request of a batch
+        """
+        start = time.perf_counter()
+        if not (0 <= src < self.graph.V and 0 <= dst < self.graph.V):
+            raise ValueError("Vertex out of range")
+        run = self._inflight.get(src)
+        if run is None:
+            run = asyncio.ensure_future(self._search(src))
+            self._inflight[src] = run
+            run.add_done_callback(lambda _: self._inflight.pop(src, None))
+        dist = await run
+        self.requests += 1
+        self._latencies.append(time.perf_counter() - start)
+        return dist[dst]
+
+    async def _search(self, src):
+        if self.batch_window:
+            await asyncio.sleep(self.batch_window)
+        self.searches += 1
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.graph.dijkstra, src)
+
+    def stats(self):
+        """
+        Get request counts and latency percentiles.
+
+        :return: dict - requests, searches and p50/p90/p99 latencies in milliseconds
+        """
+        latencies = _percentiles(latency * 1000 for latency in self._latencies)
+        return {"requests": self.requests, "searches": self.searches, "latency_ms": latencies}
+
+    async def _handle(self, reader, writer):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while line := await reader.readline():
+                request = line.decode().split()
+                if request == ["stats"]:
+                    response = json.dumps(self.stats())
+                else:
+                    try:
+                        src, dst = map(int, request)
+                        response = str(await self.distance(src, dst))
+                    except ValueError as error:
+                        response = f"error {error}"
+                writer.write(response.encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(handler)
+            writer.close()
+
+async def load_generator(address, requests, vertices, concurrency=32, sources=None, seed=0):
+    """
+    Send random distance queries to a ShortestPathServer and measure throughput.
+
+    Every connection sends its requests one after another, so up to
+    concurrency requests are in flight at a time.
+
+    :param address: tuple or str - (host, port) of a TCP server or a Unix socket path
+    :param requests: int - total number of requests
+    :param vertices: int - number of vertices in the graph
+    :param concurrency: int - number of client connections
+    :param sources: list - source vertices to pick from, all vertices by default
+    :param seed: int - random seed
+
+    :return: dict - throughput in requests per second and client latency percentiles in milliseconds
+    """
+    rng = random.Random(seed)
+    sources = sources or range(vertices)
+    queries = [(rng.choice(sources), rng.randrange(vertices)) for _ in range(requests)]
+    latencies = []
+
+    async def client(chunk):
+        if isinstance(address, str):
+            reader, writer = await asyncio.open_unix_connection(address)
+        else:
+            reader, writer = await asyncio.open_connection(*address)
+        for src, dst in chunk:
+            start = time.perf_counter()
+            writer.write(f"{src} {dst}\n".encode())
+            await writer.drain()
+            await reader.readline()
+            latencies.append((time.perf_counter() - start) * 1000)
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(queries[i::concurrency]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"throughput": requests / elapsed, "latency_ms": _percentiles(latencies)}
+
+async def benchmark_server(vertices=5_000, edges=25_000, requests=2_000, concurrency=64, hot_sources=8):
+    """
+    Run a ShortestPathServer on localhost and measure it with load_generator.
+
+    :param vertices: int - number of vertices
+    :param edges: int - number of edges
+    :param requests: int - number of requests
+    :param concurrency: int - number of client connections
+    :param hot_sources: int - number of distinct sources in the traffic
+
+    :return: None
+    """
+    server = ShortestPathServer(CSRGraph.from_edges(vertices, random_edges(vertices, edges)))
+    address = await server.start()
+    try:
+        result = await load_generator(address, requests, vertices, concurrency, list(range(hot_sources)))
+    finally:
+        await server.close()
+    print(f"Пропускна здатність: {result['throughput']:.0f} запитів/с, "
+          f"затримка клієнта: {result['latency_ms']}")
+    print("Статистика сервера:", server.stats())
+
+if __name__ == "__main__":
+    g = Graph(9)
+    g.add_edge(0, 1, 4)
+    g.add_edge(0, 7, 8)
+    g.add_edge(1, 2, 8)
+    g.add_edge(1, 7, 11)
+    g.add_edge(2, 3, 7)
+    g.add_edge(2, 8, 2)
+    g.add_edge(2, 5, 4)
+    g.add_edge(3, 4, 9)
+    g.add_edge(3, 5, 14)
+    g.add_edge(4, 5, 10)
+    g.add_edge(5, 6, 2)
+    g.add_edge(6, 7, 1)
+    g.add_edge(6, 8, 6)
+    g.add_edge(7, 8, 7)
+
+    dist = g.dijkstra(0)
+    print("Відстані від вершини 0 до всіх інших:")
+    for index, distance in enumerate(dist):
+        print(f"{index}: {distance}")
+
+    for mode in ("dijkstra", "bidirectional"):
+        distance, path = g.shortest_path(0, 4, mode)
+        print(f"Шлях 0 -> 4 ({mode}): {path}, відстань {distance}")
+
+    csr = g.freeze()
+    print("CSR збігається зі списками суміжності:", csr.dijkstra(0) == dist)
+    cache = ShortestPathCache(g)
+    for src in (0, 0, 3, 0):
+        cache.get(src)
+    g.add_edge(0, 4, 20)
+    print("Шлях 0 -> 4 після нового ребра:", cache.path(0, 4))
+    print("Статистика кешу:", cache.stats())
+
+    dynamic = DynamicShortestPaths(g, 0)
+    g.decrease_edge(3, 4, 0)
+    print("Шлях 0 -> 4 після зменшення ваги:", dynamic.path(4))
+    print("Перевірено інкрементальних оновлень:", check_dynamic_updates())
+
+    hierarchy = ContractionHierarchy.build(g)
+    print("Ієрархія стиснень збігається:", [hierarchy.distance(0, v) for v in range(g.V)] == g.dijkstra(0))
+
+    with tempfile.TemporaryDirectory() as directory:
+        edge_list = os.path.join(directory, "edges.txt")
+        with open(edge_list, "w") as file:
+            file.write("# u v weight\n")
+            file.writelines(f"{u} {v} {weight}\n" for u in g.graph for v, weight in g.graph[u])
+        binary = os.path.join(directory, "graph.bin")
+        CSRGraph.from_edge_list_file(edge_list, g.V).save(binary)
+        loaded = CSRGraph.load(binary)
+        print("Граф з бінарного файлу збігається:", loaded.dijkstra(0) == g.dijkstra(0))
+        del loaded
+
+    if "--benchmark" in sys.argv[1:]:
+        matrix = batch_dijkstra(g, range(g.V), processes=2)
+        print("Пакетний запуск збігається:", matrix == [g.dijkstra(src) for src in range(g.V)])
+
+        print("Сервер запитів:")
+        asyncio.run(benchmark_server())
+
+        print("Черги з пріоритетом для dijkstra:")
+        benchmark_queues()
+
+        print("Порівняння представлень графа:")
+        benchmark_backends()
@@ -7,15 +7,47 @@ The left child of the node at index i is at index 2*i+1, and the right child is
 In this snippet, we will implement a binary heap using a binary tree data structure.
 We will also visualize the binary heap tree using NetworkX and Matplotlib.
 
+The priority queue itself is implemented by ArrayHeap: a list-backed min heap
+with bottom-up heapify and configurable arity. In a d-ary heap the children of
+the node at index i are at indices d*i+1 .. d*i+d and its parent is at (i-1)//d.
+Higher arity makes the tree shallower and keeps the children of a node next to
+each other in memory.
+
 Time complexity:
 - add_edges: O(n)
 - add_heap_node: O(n)
 - build_heap: O(n)
 - draw_tree: O(n)
+- ArrayHeap.heapify: O(n)
+- ArrayHeap.push: O(log_d n)
+- ArrayHeap.pop, replace, pushpop: O(d * log_d n)
+- heap_layout: O(n) NumPy operations
+- draw_heap_array: O(n) NumPy operations and a constant number of artists
+
+Large heaps are drawn straight from the array: node positions follow in
+closed form from the index, all edges form one LineCollection and all
+nodes are drawn with one scatter call, no Node objects are created.
+
+HeapAnimation records every write the heap operations make to the array
+and replays them: the tree is laid out once and every frame only updates
+the colours and labels of the slots that changed, so long sequences of
+push and pop steps can be saved to a GIF or a video.
+
+The heap benchmark runs only with --benchmark:
+    python 4.binary_heap_visualisation.py --benchmark
 """
+import heapq
+import random
+import sys
+import time
 import uuid
 import networkx as nx
 import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
+import numpy as np
+from matplotlib import animation
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
 
 class Node:
     """
@@ -51,6 +83,174 @@ class Node:
         self.color = color
         self.id = str(uuid.uuid4())
 
+class ArrayHeap:
+    """
+    Class to represent a list-backed d-ary min heap.
+
+    Attributes:
+    - heap: list - heap array, heap[0] is the smallest item
+    - arity: int - number of children of every node (2, 4, 8, ...)
+
+    Methods:
+    - __init__(items, arity): build the heap from items with bottom-up heapify
+    - push(item): add an item
+    - pop(): remove and return the smallest item
+    - replace(item): pop and then push, the result may be smaller than item
+    - pushpop(item): push and then pop, returns item if it is the smallest
+    - peek(): return the smallest item
+
+    Time complexity:
+    - __init__: O(n)
+    - push: O(log_d n)
+    - pop, replace, pushpop: O(d * log_d n)
+    - peek: O(1)
+    """
+    def __init__(self, items=(), arity: int = 2) -> None:
+        """
+        Initialize the heap with items using bottom-up heapify.
+
+        :param items: iterable - initial items
+        :param arity: int - number of children of every node
+
+        :return: None
+
+        Time complexity: O(n)
+        """
+        if arity < 2:
+            raise ValueError("Heap arity must be at least 2")
+        self.arity = arity
+        self.heap = list(items)
+        self.heapify()
+
+    def heapify(self) -> None:
+        """
+        Restore the heap property of the whole array bottom-up.
+
+        :return: None
+
+        Time complexity: O(n)
+        """
+        for i in range((len(self.heap) - 2) // self.arity, -1, -1):
+            self._sift_down(i)
+
+    def push(self, item) -> None:
+        """
+        Add an item to the heap.
+
+        :param item: comparable item
+
+        :return: None
+
+        Time complexity: O(log_d n)
+        """
+        self.heap.append(item)
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        """
+        Remove and return the smallest item.
+
+        :return: the smallest item
+
+        Time complexity: O(d * log_d n)
+        """
+        if not self.heap:
+            raise IndexError("pop from empty heap")
+        last = self.heap.pop()
+        if not self.heap:
+            return last
+        smallest = self.heap[0]
+        self.heap[0] = last
+        self._sift_down(0)
+        return smallest
+
+    def replace(self, item):
+        """
+        Remove and return the smallest item, then add item.
+
+        :param item: comparable item
+
+        :return: the smallest item before item was added
+
+        Time complexity: O(d * log_d n)
+        """
+        if not self.heap:
+            raise IndexError("replace on empty heap")
+        smallest = self.heap[0]
+        self.heap[0] = item
+        self._sift_down(0)
+        return smallest
+
+    def pushpop(self, item):
+        """
+        Add item, then remove and return the smallest item.
+
+        :param item: comparable item
+
+        :return: the smallest item including item
+
+        Time complexity: O(d * log_d n)
+        """
+        if self.heap and self.heap[0] < item:
+            item, self.heap[0] = self.heap[0], item
+            self._sift_down(0)
+        return item
+
+    def peek(self):
+        """
+        Return the smallest item without removing it.
+
+        :return: the smallest item
+
+        Time complexity: O(1)
+        """
+        if not self.heap:
+            raise IndexError("peek at empty heap")
+        return self.heap[0]
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def _sift_up(self, i: int) -> None:
+        """
+        Move the item at index i up until its parent is not greater.
+
+        Time complexity: O(log_d n)
+        """
+        heap, arity = self.heap, self.arity
+        item = heap[i]
+        while i > 0:
+            parent = (i - 1) // arity
+            if not item < heap[parent]:
+                break
+            heap[i] = heap[parent]
+            i = parent
+        heap[i] = item
+
+    def _sift_down(self, i: int) -> None:
+        """
+        Move the item at index i down until no child is smaller.
+
+        Time complexity: O(d * log_d n)
+        """
+        heap, arity = self.heap, self.arity
+        size = len(heap)
+        item = heap[i]
+        while True:
+            first = arity * i + 1
+            if first >= size:
+                break
+            # Find the smallest child
+            child = first
+            for j in range(first + 1, min(first + arity, size)):
+                if heap[j] < heap[child]:
+                    child = j
+            if not heap[child] < item:
+                break
+            heap[i] = heap[child]
+            i = child
+        heap[i] = item
+
 def add_edges(graph: nx.DiGraph, node: Node, pos: dict, x: float = 0, y: float = 0, layer: int = 1):
     """
   Function to add edges to the binary heap tree.
@@ -104,13 +304,15 @@ def build_heap(arr: list) -> Node:
     """
     Function to build a binary heap from a list of values.
 
+    The values are heapified first, so the tree satisfies the heap property.
+
     :param arr: list - list of values to add to the heap
 
     :return: Node - the root of the binary heap
 
     Time complexity: O(n)
     """
-    return add_heap_node(arr, 0)
+    return add_heap_node(ArrayHeap(arr).heap, 0)
 
 def draw_tree(tree_root):
     """
@@ -131,7 +333,321 @@ def draw_tree(tree_root):
     nx.draw(tree, pos=pos, labels=labels, arrows=False, node_size=2500, node_color=colors)
     plt.show()
 
+def benchmark_heaps(n: int = 200_000, arities: tuple = (2, 4, 8)) -> None:
+    """
+    Function to compare ArrayHeap of different arities with heapq.
+
+    Every heap is built from n random values and then popped empty.
+
+    :param n: int - number of items
+    :param arities: tuple - arities of ArrayHeap to measure
+
+    :return: None
+    """
+    values = [random.random() for _ in range(n)]
+
+    start = time.perf_counter()
+    heap = list(values)
+    heapq.heapify(heap)
+    built = time.perf_counter()
+    while heap:
+        heapq.heappop(heap)
+    print(f"heapq:       heapify {built - start:.3f} s, pop all {time.perf_counter() - built:.3f} s")
+
+    for arity in arities:
+        start = time.perf_counter()
+        heap = ArrayHeap(values, arity)
+        built = time.perf_counter()
+        while heap:
+            heap.pop()
+        print(f"{arity}-ary heap: heapify {built - start:.3f} s, pop all {time.perf_counter() - built:.3f} s")
+
+def heap_layout(n: int, arity: int = 2) -> tuple:
+    """
+    Function to compute the positions of the nodes of an implicit d-ary heap.
+
+    The node k of depth L (counted from the left) is drawn at
+    x = (2k + 1) / d^L - 1, y = -L, which for d = 2 is the layout of add_edges.
+
+    :param n: int - number of nodes
+    :param arity: int - number of children of every node
+
+    :return: tuple - positions of shape (n, 2) and parent indices of shape (n,),
+             the parent of the root is -1
+
+    Time complexity: O(n)
+    """
+    index = np.arange(n, dtype=np.int64)
+    # Index of the first node of every level: (d^L - 1) / (d - 1)
+    level_starts = [0]
+    while level_starts[-1] < n:
+        level_starts.append(level_starts[-1] * arity + 1)
+    level_starts = np.array(level_starts, dtype=np.int64)
+
+    depth = np.searchsorted(level_starts, index, side="right") - 1
+    offset = index - level_starts[depth]
+    width = np.power(float(arity), depth)
+    positions = np.column_stack(((2 * offset + 1) / width - 1, -depth.astype(float)))
+    parents = (index - 1) // arity
+    return positions, parents
+
+def draw_heap_array(heap, arity: int = 2, path: str = None, ax: plt.Axes = None,
+                    show_labels: bool = None, cmap: str = "Blues") -> plt.Axes:
+    """
+    Function to draw an implicit array heap with a constant number of artists.
+
+    :param heap: list, ArrayHeap or np.ndarray - heap array
+    :param arity: int - number of children of every node, taken from ArrayHeap if given
+    :param path: str - file to save the picture to without a GUI
+    :param ax: Axes - axes to draw on, a new figure is created if None
+    :param show_labels: bool - draw the values, by default only for up to 64 nodes
+    :param cmap: str - colormap for the node values
+
+    :return: Axes - the axes with the drawing
+
+    Time complexity: O(n)
+    """
+    if isinstance(heap, ArrayHeap):
+        arity = heap.arity
+        heap = heap.heap
+    values = np.asarray(heap)
+    n = len(values)
+    positions, parents = heap_layout(n, arity)
+
+    if ax is None:
+        # A figure without pyplot does not need a GUI backend
+        ax = (Figure(figsize=(10, 6)) if path else plt.figure(figsize=(10, 6))).add_subplot()
+    ax.set_axis_off()
+
+    edges = np.stack((positions[parents[1:]], positions[1:]), axis=1)
+    ax.add_collection(LineCollection(edges, colors="gray", linewidths=0.5, zorder=1))
+    node_size = max(2500 / max(n, 1) ** 0.5, 1)
+    ax.scatter(positions[:, 0], positions[:, 1], s=node_size, c=values, cmap=cmap,
+               edgecolors="none", zorder=2)
+
+    if show_labels is None:
+        show_labels = n <= 64
+    if show_labels:
+        for (x, y), value in zip(positions, values):
+            ax.text(x, y, str(value), ha="center", va="center", zorder=3)
+
+    ax.autoscale_view()
+    if path:
+        ax.figure.savefig(path, dpi=150)
+    return ax
+
+class _TracedList(list):
+    """
+    List that logs every write: ("set", index, value), ("append", index, value)
+    and ("pop", index, value).
+    """
+    def __init__(self, items, log: list) -> None:
+        super().__init__(items)
+        self.log = log
+
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self.log.append(("set", index, value))
+
+    def append(self, value) -> None:
+        super().append(value)
+        self.log.append(("append", len(self) - 1, value))
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self.log.append(("pop", len(self), value))
+        return value
+
+class HeapAnimation:
+    """
+    Class to record the operations of an ArrayHeap and replay them as an animation.
+
+    Attributes:
+    - heap: ArrayHeap - the recorded heap, its array is replaced by a logging list until stop()
+    - initial: list - heap array at the start of the recording
+    - log: list - recorded writes to the heap array
+
+    Methods:
+    - stop(): stop recording and give the heap a plain list back
+    - animate(fig, interval, show_labels): build a FuncAnimation of the recorded steps
+    - save(path, fps): render the animation to a GIF or a video file
+
+    Time complexity:
+    - recording: O(1) per array write
+    - animate: O(n) layout once, then O(1) artist updates per frame
+    """
+    def __init__(self, heap: ArrayHeap) -> None:
+        """
+        Start recording the operations of a heap.
+
+        :param heap: ArrayHeap - heap to record
+
+        :return: None
+        """
+        self.heap = heap
+        self.initial = list(heap.heap)
+        self.log = []
+        heap.heap = _TracedList(heap.heap, self.log)
+
+    def stop(self) -> None:
+        """
+        Stop recording, the heap gets a plain list with its current contents back.
+
+        :return: None
+
+        Time complexity: O(n)
+        """
+        if isinstance(self.heap.heap, _TracedList):
+            self.heap.heap = list(self.heap.heap)
+
+    def __enter__(self) -> "HeapAnimation":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def animate(self, fig: plt.Figure = None, interval: int = 33, show_labels: bool = None,
+                cmap: str = "Blues", highlight: str = "orange") -> animation.FuncAnimation:
+        """
+        Build an animation with one frame per recorded write, or a single frame
+        of the initial heap if nothing was recorded.
+
+        :param fig: Figure - figure to draw on, a new one is created if None
+        :param interval: int - delay between frames in milliseconds
+        :param show_labels: bool - draw the values, by default only for up to 64 slots
+        :param cmap: str - colormap for the node values
+        :param highlight: str - colour of the slot written in the current frame
+
+        :return: FuncAnimation
+
+        Time complexity: O(n) setup, O(1) per frame
+        """
+        sizes = [len(self.initial)]
+        for kind, index, _ in self.log:
+            sizes.append(index + 1 if kind == "append" else index if kind == "pop" else sizes[-1])
+        capacity = max(max(sizes), 1)
+        positions, parents = heap_layout(capacity, self.heap.arity)
+
+        seen = self.initial + [value for _, _, value in self.log]
+        low, high = (min(seen), max(seen)) if seen else (0, 1)
+        colormap = plt.get_cmap(cmap)
+        highlight_rgba = np.array(mcolors.to_rgba(highlight))
+
+        def base_color(value):
+            return colormap(0.2 + 0.8 * (value - low) / ((high - low) or 1))
+
+        fig = fig if fig is not None else Figure(figsize=(10, 6))
+        ax = fig.add_subplot()
+        ax.set_axis_off()
+        ax.set_xlim(-1.05, 1.05)
+        ax.set_ylim(positions[:, 1].min() - 0.5, 0.5)
+
+        edge_colors = np.zeros((capacity - 1, 4))
+        edges = LineCollection(np.stack((positions[parents[1:]], positions[1:]), axis=1),
+                               colors=edge_colors, linewidths=0.8, animated=True)
+        ax.add_collection(edges)
+        face_colors = np.zeros((capacity, 4))
+        nodes = ax.scatter(positions[:, 0], positions[:, 1], s=max(2500 / capacity ** 0.5, 4),
+                           c=face_colors, edgecolors="none", animated=True, zorder=2)
+        if show_labels is None:
+            show_labels = capacity <= 64
+        texts = [ax.text(x, y, "", ha="center", va="center", animated=True, zorder=3)
+                 for x, y in positions] if show_labels else []
+
+        state = {"values": [], "highlighted": None}
+
+        def show(index, value) -> None:
+            face_colors[index] = base_color(value)
+            if index > 0:
+                edge_colors[index - 1] = (0.5, 0.5, 0.5, 1)
+            if texts:
+                texts[index].set_text(str(value))
+
+        def hide(index) -> None:
+            face_colors[index] = 0
+            if index > 0:
+                edge_colors[index - 1] = 0
+            if texts:
+                texts[index].set_text("")
+
+        def init():
+            face_colors[:] = 0
+            edge_colors[:] = 0
+            for text in texts:
+                text.set_text("")
+            state["values"] = list(self.initial)
+            state["highlighted"] = None
+            for index, value in enumerate(self.initial):
+                show(index, value)
+            nodes.set_facecolors(face_colors)
+            edges.set_colors(edge_colors)
+            return [nodes, edges, *texts]
+
+        def update(frame):
+            if frame is None:
+                # Nothing was recorded, only the initial heap is shown
+                return [nodes, edges, *texts]
+            values = state["values"]
+            previous = state["highlighted"]
+            if previous is not None and previous < len(values):
+                face_colors[previous] = base_color(values[previous])
+
+            kind, index, value = self.log[frame]
+            changed = [nodes, edges]
+            if kind == "pop":
+                values.pop()
+                hide(index)
+                state["highlighted"] = None
+            else:
+                if kind == "append":
+                    values.append(value)
+                else:
+                    values[index] = value
+                show(index, value)
+                face_colors[index] = highlight_rgba
+                state["highlighted"] = index
+            if texts:
+                changed.append(texts[index])
+
+            nodes.set_facecolors(face_colors)
+            edges.set_colors(edge_colors)
+            return changed
+
+        return animation.FuncAnimation(fig, update, frames=len(self.log) or [None], init_func=init,
+                                       interval=interval, blit=True, repeat=False)
+
+    def save(self, path: str, fps: int = 30, **kwargs) -> None:
+        """
+        Render the recorded steps to a file, GIF via Pillow, other formats via FFmpeg.
+
+        :param path: str - output file, e.g. "heap.gif" or "heap.mp4"
+        :param fps: int - frames per second
+        :param kwargs: keyword arguments of animate
+
+        :return: None
+        """
+        anim = self.animate(interval=1000 // fps, **kwargs)
+        writer = animation.PillowWriter(fps=fps) if path.endswith(".gif") else animation.FFMpegWriter(fps=fps)
+        anim.save(path, writer=writer)
+
 if __name__ == "__main__":
     heap_values = [10, 4, 11, 12, 20, 15, 16]
     root = build_heap(heap_values)
     draw_tree(root)
+
+    # Animation of sift-up and sift-down steps
+    recorded = ArrayHeap(heap_values)
+    with HeapAnimation(recorded) as recording:
+        for value in (3, 18, 1):
+            recorded.push(value)
+        recorded.pop()
+        recorded.pushpop(7)
+    anim = recording.animate(fig=plt.figure(figsize=(8, 5)), interval=300)
+    plt.show()
+
+    # A large heap is drawn from the array directly
+    draw_heap_array(ArrayHeap(np.random.rand(100_000).tolist(), arity=4))
+    plt.show()
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_heaps()
@@ -3,11 +3,30 @@ Task:
 - Implement Depth First Search (DFS) and Breadth First Search (BFS) algorithms for a binary tree.
 - Visualize the traversal of the binary tree using NetworkX and Matplotlib.
 - Use different colors to represent the order of traversal.
+
+Traversals can return a rank mapping (node id -> position in the visit order)
+alongside the order, so colouring the tree takes O(n) instead of searching
+the order list for every node.
+
+All traversals are lazy generators driven by an explicit stack or a deque, so
+they handle skewed trees that are far deeper than the recursion limit.
+iter_inorder(root, morris=True) walks the tree with O(1) extra memory by
+temporarily threading it.
+
+ArrayTree stores a tree as typed arrays of values and child indices and
+computes depths, subtree sizes, traversal ranks and layout coordinates with
+NumPy over an Euler tour, so no per-node Python objects are needed.
+
+The large-scale layout and the traversal benchmark run only with --benchmark:
+    python 5.binary_tree_traverse_visualisation.py --benchmark
 """
+import sys
+import time
 import uuid
+from array import array
+from collections import deque
 import networkx as nx
 import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
 import numpy as np
 
 class Node:
@@ -101,33 +120,203 @@ def generate_colors(n: int) -> list:
     Time complexity: O(n)
     """
     cmap = plt.cm.Blues  # Uses colormap Blues for color generation
-    return [mcolors.rgb2hex(cmap(i)) for i in np.linspace(0, 1, n)]
+    # The whole ramp is mapped and packed into 0xRRGGBB integers in one step
+    rgb = np.rint(cmap(np.linspace(0, 1, n))[:, :3] * 255).astype(np.int64)
+    packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    return np.char.mod("#%06x", packed).tolist()
+
+def rank_map(order: list) -> dict:
+    """
+    Function to map every node id to its position in a traversal order.
+
+    :param order: list - order of the nodes
+
+    :return: dict - rank of every node id
 
-def update_colors(node: Node, color_map: list, order: list) -> None:
+    Time complexity: O(n)
+    """
+    return {node_id: rank for rank, node_id in enumerate(order)}
+
+def update_colors(node: Node, color_map: list, order) -> None:
     """
     Function to update the colors of the nodes in the tree.
 
     :param node: Node - the current node
     :param color_map: list - list of colors
-    :param order: list - order of the nodes
+    :param order: list or dict - order of the nodes or their rank mapping
 
     :return: None
 
     Time complexity: O(n)
     """
-    if node:
-        node.color = color_map[order.index(node.id)]
-        update_colors(node.left, color_map, order)
-        update_colors(node.right, color_map, order)
+    ranks = order if isinstance(order, dict) else rank_map(order)
+    for current in iter_preorder(node):
+        current.color = color_map[ranks[current.id]]
+
+def iter_preorder(root: Node):
+    """
+    Generator to traverse a binary tree in pre-order (node, left, right).
+
+    :param root: Node - the root of the tree
+
+    :return: generator - nodes in pre-order
+
+    Time complexity: O(n), extra memory O(h)
+    """
+    stack = [root] if root else []
+    while stack:
+        node = stack.pop()
+        yield node
+        # The right child goes first so the left subtree is popped first
+        if node.right:
+            stack.append(node.right)
+        if node.left:
+            stack.append(node.left)
+
+def _morris_inorder(root: Node):
+    """
+    Generator for the Morris in-order walk, which threads every in-order
+    predecessor to its successor and removes the thread on the way back.
+    """
+    current = root
+    while current:
+        if current.left is None:
+            yield current
+            current = current.right
+            continue
+        pred = current.left
+        while pred.right and pred.right is not current:
+            pred = pred.right
+        if pred.right is None:
+            pred.right = current
+            current = current.left
+        else:
+            pred.right = None
+            yield current
+            current = current.right
+
+def iter_inorder(root: Node, morris: bool = False):
+    """
+    Generator to traverse a binary tree in in-order (left, node, right).
+
+    With morris=True the tree is temporarily modified while the generator is
+    running: the right pointers of some nodes point back to their in-order
+    successor. The tree is restored when the generator is exhausted or
+    closed.
+
+    :param root: Node - the root of the tree
+    :param morris: bool - use the Morris traversal with O(1) extra memory
+
+    :return: generator - nodes in in-order
+
+    Time complexity: O(n), extra memory O(h) or O(1) with morris=True
+    """
+    if morris:
+        steps = _morris_inorder(root)
+        try:
+            for node in steps:
+                yield node
+        finally:
+            # Finishing the walk removes the threads left by an early stop
+            for _ in steps:
+                pass
+        return
+    stack = []
+    node = root
+    while stack or node:
+        while node:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+def iter_postorder(root: Node):
+    """
+    Generator to traverse a binary tree in post-order (left, right, node).
+
+    :param root: Node - the root of the tree
+
+    :return: generator - nodes in post-order
+
+    Time complexity: O(n), extra memory O(h)
+    """
+    stack = []
+    node = root
+    last = None
+    while stack or node:
+        if node:
+            stack.append(node)
+            node = node.left
+            continue
+        top = stack[-1]
+        if top.right and top.right is not last:
+            node = top.right
+        else:
+            last = stack.pop()
+            yield last
+
+def iter_level_order(root: Node):
+    """
+    Generator to traverse a binary tree level by level, left to right.
+
+    :param root: Node - the root of the tree
+
+    :return: generator - nodes in level-order
+
+    Time complexity: O(n), extra memory O(w) where w is the widest level
+    """
+    queue = deque([root] if root else [])
+    while queue:
+        node = queue.popleft()
+        yield node
+        if node.left:
+            queue.append(node.left)
+        if node.right:
+            queue.append(node.right)
+
+def iter_reverse_level_order(root: Node):
+    """
+    Generator to traverse a binary tree level by level from the deepest level
+    up to the root, left to right within a level.
+
+    :param root: Node - the root of the tree
+
+    :return: generator - nodes in reverse level-order
 
-def dfs(node: Node, visited: list = None) -> list:
+    Time complexity: O(n), extra memory O(n)
+    """
+    # Level-order visiting right before left, reversed, gives the wanted order
+    stack = []
+    queue = deque([root] if root else [])
+    while queue:
+        node = queue.popleft()
+        stack.append(node)
+        if node.right:
+            queue.append(node.right)
+        if node.left:
+            queue.append(node.left)
+    while stack:
+        yield stack.pop()
+
+TRAVERSALS = {
+    "preorder": iter_preorder,
+    "inorder": iter_inorder,
+    "morris": lambda root: iter_inorder(root, morris=True),
+    "postorder": iter_postorder,
+    "level": iter_level_order,
+    "reverse_level": iter_reverse_level_order,
+}
+
+def dfs(node: Node, visited: list = None, with_ranks: bool = False):
     """
     Function to perform Depth First Search (DFS) on a binary tree.
 
     :param node: Node - the current node
     :param visited: list - list to store visited nodes
+    :param with_ranks: bool - also return the rank mapping of the nodes
 
-    :return: list - list of visited nodes
+    :return: list - list of visited nodes, or a tuple of the list and the rank mapping
 
     Time complexity
     - Worst-case: O(n)
@@ -135,34 +324,353 @@ def dfs(node: Node, visited: list = None) -> list:
     """
     if visited is None:
         visited = []
-    if node:
-        visited.append(node.id)
-        dfs(node.left, visited)
-        dfs(node.right, visited)
+    visited.extend(current.id for current in iter_preorder(node))
+    if with_ranks:
+        return visited, rank_map(visited)
     return visited
 
-def bfs(node: Node):
+def bfs(node: Node, with_ranks: bool = False):
     """
     Function to perform Breadth First Search (BFS) on a binary tree.
 
     :param node: Node - the root node of the tree
+    :param with_ranks: bool - also return the rank mapping of the nodes
 
-    :return: list - list of visited nodes
+    :return: list - list of visited nodes, or a tuple of the list and the rank mapping
 
     Time complexity
     - Worst-case: O(n)
     - Best-case: O(1)
     """
-    queue = [node]
-    visited = []
-    while queue:
-        current = queue.pop(0)
-        if current:
-            visited.append(current.id)
-            queue.append(current.left)
-            queue.append(current.right)
+    visited = [current.id for current in iter_level_order(node)]
+    if with_ranks:
+        return visited, rank_map(visited)
     return visited
 
+def degenerate_tree(n: int, side: str = "left") -> Node:
+    """
+    Function to build a tree of n nodes where every node has a single child.
+
+    :param n: int - number of nodes
+    :param side: str - "left" or "right", the side every child hangs on
+
+    :return: Node - the root of the tree
+
+    Time complexity: O(n)
+    """
+    root = Node(0) if n else None
+    node = root
+    for i in range(1, n):
+        child = Node(i)
+        setattr(node, side, child)
+        node = child
+    return root
+
+def balanced_tree(n: int) -> Node:
+    """
+    Function to build a complete binary tree of n nodes in level-order.
+
+    :param n: int - number of nodes
+
+    :return: Node - the root of the tree
+
+    Time complexity: O(n)
+    """
+    nodes = [Node(i) for i in range(n)]
+    for i in range(1, n):
+        parent = nodes[(i - 1) // 2]
+        if i % 2:
+            parent.left = nodes[i]
+        else:
+            parent.right = nodes[i]
+    return nodes[0] if nodes else None
+
+def benchmark_traversals(n: int = 200_000, repeat: int = 3) -> dict:
+    """
+    Function to time every traversal on a left-degenerate, a right-degenerate
+    and a balanced tree of n nodes.
+
+    :param n: int - number of nodes in every tree
+    :param repeat: int - number of runs, the best one is reported
+
+    :return: dict - best time in seconds per (shape, traversal)
+
+    Time complexity: O(n * repeat) per traversal
+    """
+    trees = {
+        "degenerate_left": degenerate_tree(n, "left"),
+        "degenerate_right": degenerate_tree(n, "right"),
+        "balanced": balanced_tree(n),
+    }
+    results = {}
+    for shape, root in trees.items():
+        for name, traversal in TRAVERSALS.items():
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for _ in traversal(root):
+                    pass
+                best = min(best, time.perf_counter() - start)
+            results[shape, name] = best
+    return results
+
+class ArrayTree:
+    """
+    Compact binary tree stored as a struct of arrays.
+
+    Slot i holds values[i], and left[i] / right[i] are the slot indices of its
+    children, -1 marks a missing child. Every slot must belong to the tree
+    rooted at slot root.
+
+    All analyses walk the Euler tour of the tree (down and up edges of every
+    node). The tour is ranked by pointer jumping, which takes O(log n) NumPy
+    steps regardless of the shape of the tree, so million-node chains are as
+    cheap as balanced trees.
+    """
+    def __init__(self, values, left, right, root: int = 0, typecode: str = "q"):
+        """
+        Initialize the tree from parallel sequences.
+
+        :param values: iterable - value of every slot
+        :param left: iterable - left child index of every slot or -1
+        :param right: iterable - right child index of every slot or -1
+        :param root: int - index of the root slot
+        :param typecode: str - array typecode for the values
+
+        :return: None
+        """
+        self.values = array(typecode, values)
+        self.left = array("q", left)
+        self.right = array("q", right)
+        self.root = root
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @classmethod
+    def from_node(cls, root: Node, typecode: str = "q") -> "ArrayTree":
+        """
+        Convert a Node tree, slots are numbered in level-order.
+
+        :param root: Node - the root of the tree
+        :param typecode: str - array typecode for the values
+
+        :return: ArrayTree - compact copy of the tree
+
+        Time complexity: O(n)
+        """
+        nodes = list(iter_level_order(root))
+        index = {id(node): i for i, node in enumerate(nodes)}
+        return cls(
+            (node.val for node in nodes),
+            (index[id(node.left)] if node.left else -1 for node in nodes),
+            (index[id(node.right)] if node.right else -1 for node in nodes),
+            typecode=typecode,
+        )
+
+    @classmethod
+    def from_numpy(cls, values, left, right, root: int = 0) -> "ArrayTree":
+        """
+        Build the tree from NumPy arrays without a per-node loop.
+
+        :param values: np.ndarray - value of every slot
+        :param left: np.ndarray - left child index of every slot or -1
+        :param right: np.ndarray - right child index of every slot or -1
+        :param root: int - index of the root slot
+
+        :return: ArrayTree - the tree
+
+        Time complexity: O(n)
+        """
+        values = np.ascontiguousarray(values)
+        tree = cls((), (), (), root, typecode=values.dtype.char)
+        tree.values.frombytes(values.tobytes())
+        tree.left.frombytes(np.ascontiguousarray(left, dtype=np.int64).tobytes())
+        tree.right.frombytes(np.ascontiguousarray(right, dtype=np.int64).tobytes())
+        return tree
+
+    @classmethod
+    def complete(cls, n: int) -> "ArrayTree":
+        """
+        Build a complete binary tree of n nodes in level-order.
+
+        :param n: int - number of nodes
+
+        :return: ArrayTree - the tree, slot i holds the value i
+
+        Time complexity: O(n)
+        """
+        index = np.arange(n, dtype=np.int64)
+        left = 2 * index + 1
+        right = left + 1
+        return cls.from_numpy(index, np.where(left < n, left, -1), np.where(right < n, right, -1))
+
+    def to_node(self, colors: list = None) -> Node:
+        """
+        Convert the tree back to Node objects.
+
+        :param colors: list - optional color of every slot
+
+        :return: Node - the root of the tree or None if it is empty
+
+        Time complexity: O(n)
+        """
+        if not len(self):
+            return None
+        nodes = [Node(value) for value in self.values]
+        for i, node in enumerate(nodes):
+            if self.left[i] >= 0:
+                node.left = nodes[self.left[i]]
+            if self.right[i] >= 0:
+                node.right = nodes[self.right[i]]
+            if colors is not None:
+                node.color = colors[i]
+        return nodes[self.root]
+
+    def _children(self) -> tuple:
+        """
+        Zero-copy NumPy views of the child index arrays.
+        """
+        return np.frombuffer(self.left, dtype=np.int64), np.frombuffer(self.right, dtype=np.int64)
+
+    def parents(self) -> np.ndarray:
+        """
+        Function to compute the parent index of every slot.
+
+        :return: np.ndarray - parent index of every slot, -1 for the root
+
+        Time complexity: O(n)
+        """
+        left, right = self._children()
+        parent = np.full(len(self), -1, dtype=np.int64)
+        slots = np.arange(len(self), dtype=np.int64)
+        has_left = left >= 0
+        has_right = right >= 0
+        parent[left[has_left]] = slots[has_left]
+        parent[right[has_right]] = slots[has_right]
+        return parent
+
+    def _euler_tour(self) -> tuple:
+        """
+        Rank the Euler tour of the tree.
+
+        Edge i (i < n) is the step down into slot i and edge n + i the step
+        back up from it, the tour starts with the root's down edge and ends
+        with its up edge.
+
+        :return: tuple - (position of every edge in the tour, edges in tour order)
+
+        Time complexity: O(n log n) work in O(log n) NumPy steps
+        """
+        n = len(self)
+        left, right = self._children()
+        parent = self.parents()
+        slots = np.arange(n, dtype=np.int64)
+        # Down into a slot: visit its first child, or turn around at a leaf
+        down_next = np.where(left >= 0, left, np.where(right >= 0, right, n + slots))
+        # Up from a slot: visit the right sibling if any, otherwise go on up
+        has_parent = parent >= 0
+        safe_parent = np.where(has_parent, parent, 0)
+        sibling = right[safe_parent]
+        to_sibling = has_parent & (left[safe_parent] == slots) & (sibling >= 0)
+        up_next = np.where(to_sibling, sibling, n + safe_parent)
+        up_next[~has_parent] = n + slots[~has_parent]
+        succ = np.concatenate((down_next, up_next))
+        # Pointer jumping: distance of every edge to the end of the tour
+        dist = (succ != np.arange(2 * n)).astype(np.int64)
+        while True:
+            jumped = succ[succ]
+            if np.array_equal(jumped, succ):
+                break
+            dist += dist[succ]
+            succ = jumped
+        position = (2 * n - 1) - dist
+        tour = np.empty(2 * n, dtype=np.int64)
+        tour[position] = np.arange(2 * n)
+        return position, tour
+
+    def depths(self) -> np.ndarray:
+        """
+        Function to compute the depth of every slot, the root has depth 0.
+
+        :return: np.ndarray - depth of every slot
+
+        Time complexity: O(n log n)
+        """
+        n = len(self)
+        position, tour = self._euler_tour()
+        level = np.cumsum(np.where(tour < n, 1, -1))
+        return level[position[:n]] - 1
+
+    def subtree_sizes(self) -> np.ndarray:
+        """
+        Function to compute the number of nodes in the subtree of every slot.
+
+        :return: np.ndarray - subtree size of every slot
+
+        Time complexity: O(n log n)
+        """
+        n = len(self)
+        position, _ = self._euler_tour()
+        return (position[n:] - position[:n] + 1) // 2
+
+    def preorder_ranks(self) -> np.ndarray:
+        """
+        Function to compute the pre-order position of every slot.
+
+        :return: np.ndarray - pre-order rank of every slot
+
+        Time complexity: O(n log n)
+        """
+        n = len(self)
+        position, tour = self._euler_tour()
+        return np.cumsum(tour < n)[position[:n]] - 1
+
+    def level_order_ranks(self) -> np.ndarray:
+        """
+        Function to compute the level-order position of every slot.
+
+        Within a level pre-order keeps the left to right order, so sorting
+        by (depth, pre-order rank) gives the level-order.
+
+        :return: np.ndarray - level-order rank of every slot
+
+        Time complexity: O(n log n)
+        """
+        n = len(self)
+        position, tour = self._euler_tour()
+        depth = np.cumsum(np.where(tour < n, 1, -1))[position[:n]]
+        preorder = np.cumsum(tour < n)[position[:n]]
+        ranks = np.empty(n, dtype=np.int64)
+        ranks[np.lexsort((preorder, depth))] = np.arange(n)
+        return ranks
+
+    def layout(self) -> tuple:
+        """
+        Function to compute the same node coordinates as add_edges.
+
+        A child is placed 1 / 2 ** depth left or right of its parent and one
+        level below it, so x is the sum of these offsets along the path from
+        the root. The offsets are added on the down edges and removed on the
+        up edges of the tour.
+
+        :return: tuple - (x, y) coordinates of every slot as NumPy arrays
+
+        Time complexity: O(n log n)
+        """
+        n = len(self)
+        position, tour = self._euler_tour()
+        is_down = tour < n
+        level = np.cumsum(np.where(is_down, 1, -1))
+        depth = level[position[:n]] - 1
+        parent = self.parents()
+        left, _ = self._children()
+        is_left = (parent >= 0) & (left[np.where(parent >= 0, parent, 0)] == np.arange(n))
+        offset = np.where(parent >= 0, np.where(is_left, -1.0, 1.0), 0.0) * np.exp2(-depth.astype(np.float64))
+        node = np.where(is_down, tour, tour - n)
+        x = np.cumsum(np.where(is_down, offset[node], -offset[node]))[position[:n]]
+        return x, -depth.astype(np.float64)
+
 if __name__ == "__main__":
     root = Node(0)
     root.left = Node(4)
@@ -172,15 +680,28 @@ if __name__ == "__main__":
     root.right.left = Node(3)
     root.right.right = Node(2)
 
-    dfs_order = dfs(root)
-    bfs_order = bfs(root)
+    dfs_order, dfs_ranks = dfs(root, with_ranks=True)
+    bfs_order, bfs_ranks = bfs(root, with_ranks=True)
     colors_dfs = generate_colors(len(dfs_order))
     colors_bfs = generate_colors(len(bfs_order))
 
     # Візуалізація DFS
-    update_colors(root, colors_dfs, dfs_order)
+    update_colors(root, colors_dfs, dfs_ranks)
     draw_tree(root)
 
     # Візуалізація BFS
-    update_colors(root, colors_bfs, bfs_order)
+    update_colors(root, colors_bfs, bfs_ranks)
     draw_tree(root)
+
+    compact = ArrayTree.from_node(root)
+    print("Level-order ranks:", compact.level_order_ranks().tolist())
+    print("Subtree sizes:", compact.subtree_sizes().tolist())
+
+    if "--benchmark" in sys.argv[1:]:
+        big = ArrayTree.complete(2_000_000)
+        start = time.perf_counter()
+        big_x, big_y = big.layout()
+        print(f"Layout of {len(big)} nodes: {time.perf_counter() - start:.2f} s")
+
+        for (shape, name), seconds in benchmark_traversals().items():
+            print(f"{shape:>16} {name:>13}: {seconds * 1000:8.1f} ms")
@@ -1,3 +1,9 @@
+import random
+import sys
+import time
+
+import numpy as np
+
 def greedy_algorithm(items: dict, budget: int) -> tuple:
     """
     Find the optimal combination of items to maximize the total calories within the given budget.
@@ -28,39 +34,259 @@ def greedy_algorithm(items: dict, budget: int) -> tuple:
 
     return chosen_items, total_calories
 
-def dynamic_programming(items: dict, budget: int) -> tuple:
+def _dp_table_python(items: dict, budget: int, decisions: list = None) -> list:
     """
-    Find the optimal combination of items to maximize the total calories within the given budget.
+    Compute the best calories for every budget from 0 to budget, one cell at a time.
 
     :param items: dict - dictionary of items with their calories and cost
     :param budget: int - the maximum budget
+    :param decisions: list - if given, one bit-packed row per item is appended,
+                             bit b is set when the item improves dp[b]
 
-    :return: tuple - list of chosen items and total calories
+    :return: list - best total calories for every budget
 
     Time complexity: O(n * budget)
     """
-
-    # Create a list of tuples with the name of the item and the cost per calorie
     dp = [0] * (budget + 1)
 
     for name, info in items.items():
         cost = info['cost']
         calories = info['calories']
+        taken = bytearray((budget >> 3) + 1) if decisions is not None else None
         # Update the dp array for each item
         for current_budget in range(budget, cost - 1, -1):
-            dp[current_budget] = max(dp[current_budget], dp[current_budget - cost] + calories)
+            candidate = dp[current_budget - cost] + calories
+            if candidate > dp[current_budget]:
+                dp[current_budget] = candidate
+                if taken is not None:
+                    taken[current_budget >> 3] |= 1 << (current_budget & 7)
+        if decisions is not None:
+            decisions.append(taken)
+
+    return dp
+
+def _dp_table_numpy(items: dict, budget: int, decisions: list = None) -> np.ndarray:
+    """
+    Compute the best calories for every budget from 0 to budget, one row update per item.
+
+    The row for an item is max(dp[b], dp[b - cost] + calories) over all b >= cost.
+    The right-hand side is evaluated into a temporary before the in-place update,
+    so every item is still taken at most once.
+
+    :param items: dict - dictionary of items with their calories and cost
+    :param budget: int - the maximum budget
+    :param decisions: list - if given, one bit-packed row per item is appended,
+                             bit b is set when the item improves dp[b]
+
+    :return: np.ndarray - best total calories for every budget
+
+    Time complexity: O(n * budget) in n NumPy steps
+    """
+    calories = [info['calories'] for info in items.values()]
+    # Integer calories, and no items at all, keep the exact int64 table
+    if all(isinstance(value, (int, np.integer)) for value in calories):
+        dtype = np.int64
+    else:
+        dtype = np.result_type(np.int64, np.asarray(calories))
+    dp = np.zeros(budget + 1, dtype=dtype)
+
+    for info in items.values():
+        cost = info['cost']
+        if cost > budget:
+            if decisions is not None:
+                decisions.append(None)
+            continue
+        candidate = dp[:budget + 1 - cost] + info['calories']
+        if decisions is not None:
+            taken = np.zeros(budget + 1, dtype=bool)
+            taken[cost:] = candidate > dp[cost:]
+            decisions.append(np.packbits(taken, bitorder="little"))
+        np.maximum(dp[cost:], candidate, out=dp[cost:])
+
+    return dp
 
-    # Find the chosen items based on the dp array and the budget
+DP_ENGINES = {
+    "python": _dp_table_python,
+    "numpy": _dp_table_numpy,
+}
+
+def _reconstruct_from_decisions(items: dict, budget: int, decisions: list) -> list:
+    """
+    Recover the chosen items by walking the decision rows from the last item back.
+
+    Row i says whether item i improved the table at a budget given only items
+    before it, so at the remaining budget it tells exactly whether the item is
+    part of the optimal set.
+
+    :param items: dict - dictionary of items with their calories and cost
+    :param budget: int - the maximum budget
+    :param decisions: list - bit-packed decision row of every item, None if never taken
+
+    :return: list - names of the chosen items in item order
+
+    Time complexity: O(n)
+    """
     chosen_items = []
     current_budget = budget
-    for name, info in items.items():
-        cost = info['cost']
-        calories = info['calories']
-        if current_budget >= cost and dp[current_budget] == dp[current_budget - cost] + calories:
+    for (name, info), taken in zip(reversed(items.items()), reversed(decisions)):
+        if taken is not None and taken[current_budget >> 3] >> (current_budget & 7) & 1:
             chosen_items.append(name)
-            current_budget -= cost
+            current_budget -= info['cost']
+    chosen_items.reverse()
+    return chosen_items
+
+def _hirschberg_items(entries: list, budget: int, table) -> list:
+    """
+    Recover the chosen items with divide and conquer in O(budget) memory.
+
+    The best calories of the first half for every budget b and of the second
+    half for budget - b are combined, the best split b is solved recursively
+    for both halves.
+
+    :param entries: list - (name, info) pairs of the items
+    :param budget: int - the maximum budget
+    :param table: function - dp table engine
 
-    return chosen_items, dp[budget]
+    :return: list - names of the chosen items in item order
+
+    Time complexity: O(n * budget * log n)
+    """
+    if not entries:
+        return []
+    if len(entries) == 1:
+        name, info = entries[0]
+        return [name] if info['cost'] <= budget and info['calories'] > 0 else []
+    middle = len(entries) // 2
+    front = np.asarray(table(dict(entries[:middle]), budget))
+    back = np.asarray(table(dict(entries[middle:]), budget))
+    split = int(np.argmax(front + back[::-1]))
+    del front, back
+    return (_hirschberg_items(entries[:middle], split, table)
+            + _hirschberg_items(entries[middle:], budget - split, table))
+
+RECONSTRUCTIONS = ("table", "hirschberg")
+
+def dynamic_programming(items: dict, budget: int, engine: str = "python",
+                        reconstruction: str = "table") -> tuple:
+    """
+    Find the optimal combination of items to maximize the total calories within the given budget.
+
+    "table" keeps one bit per item per budget, n * budget / 8 bytes in total.
+    "hirschberg" keeps O(budget) memory at the cost of a log n factor in time.
+
+    :param items: dict - dictionary of items with their calories and cost
+    :param budget: int - the maximum budget
+    :param engine: str - "python" for the cell by cell loop or "numpy" for vectorized row updates
+    :param reconstruction: str - "table" or "hirschberg"
+
+    :return: tuple - list of chosen items and total calories
+
+    Time complexity: O(n * budget), O(n * budget * log n) for "hirschberg"
+    """
+    if engine not in DP_ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {sorted(DP_ENGINES)}")
+    if reconstruction not in RECONSTRUCTIONS:
+        raise ValueError(f"Unknown reconstruction {reconstruction!r}, expected one of {RECONSTRUCTIONS}")
+    table = DP_ENGINES[engine]
+
+    if reconstruction == "table":
+        decisions = []
+        dp = table(items, budget, decisions)
+        chosen_items = _reconstruct_from_decisions(items, budget, decisions)
+    else:
+        dp = table(items, budget)
+        chosen_items = _hirschberg_items(list(items.items()), budget, table)
+
+    return chosen_items, dp[budget].item() if engine == "numpy" else dp[budget]
+
+def check_reconstruction(trials: int = 300, seed: int = 0) -> int:
+    """
+    Check every engine and reconstruction against brute force on small random instances.
+
+    :param trials: int - number of random instances
+    :param seed: int - random seed
+
+    :return: int - number of checked solutions
+
+    Time complexity: O(trials * 2^n)
+    """
+    rng = random.Random(seed)
+    checked = 0
+    for _ in range(trials):
+        items = {
+            f"item-{i}": {"cost": rng.randint(0, 15), "calories": rng.randint(0, 40)}
+            for i in range(rng.randint(0, 10))
+        }
+        budget = rng.randint(0, 60)
+        entries = list(items.values())
+        best = max(
+            sum(info['calories'] for bit, info in enumerate(entries) if mask >> bit & 1)
+            for mask in range(1 << len(entries))
+            if sum(info['cost'] for bit, info in enumerate(entries) if mask >> bit & 1) <= budget
+        )
+        for engine in DP_ENGINES:
+            for reconstruction in RECONSTRUCTIONS:
+                chosen_items, total_calories = dynamic_programming(items, budget, engine, reconstruction)
+                if total_calories != best:
+                    raise AssertionError(f"Total calories {total_calories} differ from brute force {best}")
+                if sum(items[name]['calories'] for name in chosen_items) != best:
+                    raise AssertionError(f"Chosen items {chosen_items} do not add up to the total calories")
+                if sum(items[name]['cost'] for name in chosen_items) > budget:
+                    raise AssertionError(f"Chosen items {chosen_items} exceed the budget")
+                checked += 1
+    return checked
+
+def random_items(n: int, max_cost: int, max_calories: int = 1000, seed: int = 0) -> dict:
+    """
+    Generate n random items in the same format as the menu.
+
+    :param n: int - number of items
+    :param max_cost: int - maximum cost of an item
+    :param max_calories: int - maximum calories of an item
+    :param seed: int - random seed
+
+    :return: dict - dictionary of items with their calories and cost
+
+    Time complexity: O(n)
+    """
+    rng = random.Random(seed)
+    return {
+        f"item-{i}": {"cost": rng.randint(1, max_cost), "calories": rng.randint(1, max_calories)}
+        for i in range(n)
+    }
+
+def benchmark_dp_engines(item_counts=(10, 100, 1000), budgets=(1_000, 100_000, 1_000_000),
+                         python_limit: int = 10_000_000) -> list:
+    """
+    Time both dynamic programming engines across item counts and budgets.
+
+    Only the dp tables are timed, item reconstruction is not included.
+    The python engine is skipped when n * budget exceeds python_limit cells.
+
+    :param item_counts: iterable - numbers of items
+    :param budgets: iterable - budgets
+    :param python_limit: int - largest table the python engine is run on
+
+    :return: list - (n, budget, engine, seconds) for every run, seconds is None if skipped
+
+    Time complexity: O(n * budget) per run
+    """
+    results = []
+    for n in item_counts:
+        for budget in budgets:
+            items = random_items(n, max(1, budget // 10), seed=n)
+            best = {}
+            for engine in DP_ENGINES:
+                if engine == "python" and n * budget > python_limit:
+                    results.append((n, budget, engine, None))
+                    continue
+                start = time.perf_counter()
+                dp = DP_ENGINES[engine](items, budget)
+                results.append((n, budget, engine, time.perf_counter() - start))
+                best[engine] = dp[budget]
+            if len(set(best.values())) > 1:
+                raise AssertionError(f"Engines disagree for n={n}, budget={budget}: {best}")
+    return results
 
 if __name__ == "__main__":
     items = {
@@ -79,4 +305,13 @@ if __name__ == "__main__":
 
     print("\nDynamic Programming Output:")
     chosen_items_dp, total_calories_dp = dynamic_programming(items, budget)
-    print("Chosen Items:", chosen_items_dp, "Total Calories:", total_calories_dp)
\ No newline at end of file
+    print("Chosen Items:", chosen_items_dp, "Total Calories:", total_calories_dp)
+
+    print("\nChecked reconstructions against brute force:", check_reconstruction())
+
+    # The engine benchmark runs only with --benchmark
+    if "--benchmark" in sys.argv[1:]:
+        print("\nDynamic Programming Engines:")
+        for n, budget, engine, seconds in benchmark_dp_engines():
+            timing = "skipped" if seconds is None else f"{seconds:.3f} s"
+            print(f"n={n:>5} budget={budget:>9} {engine:>6}: {timing}")
\ No newline at end of file